@@ -7,6 +7,8 @@ from app.config.logger_loader import app_logger
 from app.utils.helpers import helpers
 from app.extensions import db, ma
 from app.routes import register_blueprints
+from app.utils.compression import init_compression
+from app.utils.rate_limit import init_rate_limiting
 
 jwt = JWTManager()
 
@@ -55,9 +57,15 @@ def create_app():
     ma.init_app(app)
     jwt.init_app(app)
 
+    # Throttle login, uploads and exports per client IP and identity before any view work
+    init_rate_limiting(app, config_loader.config.get("rate_limits", {}))
+
     # Register routes/blueprints
     register_blueprints(app)
 
+    # Compress responses (gzip, or brotli when installed) for clients that accept it
+    init_compression(app, config_loader.config.get("compression", {}))
+
     # Log ready status
     app_logger.info("✅ Flask App Initialized Successfully.")
     return app
@@ -44,6 +44,109 @@ create table if not exists stocks_data (
     uploaded_at timestamp default now()
 );
 
+-- ===============================
+-- ⏳ Upload Jobs Table
+-- ===============================
+create table if not exists upload_jobs (
+    id uuid primary key default gen_random_uuid(),
+    filename text not null,
+    file_path text not null,
+    status varchar(16) not null default 'queued',
+    rows_parsed integer not null default 0,
+    rows_inserted integer not null default 0,
+    rows_skipped integer not null default 0,
+    error text,
+    sheets jsonb,
+    duplicate_of uuid references upload_jobs(id) on delete set null,
+    created_by uuid references users(id) on delete set null,
+    created_at timestamp default now(),
+    started_at timestamp,
+    finished_at timestamp
+);
+
+-- ===============================
+-- 🧬 Stock Uploads Table (file fingerprints)
+-- ===============================
+create table if not exists stock_uploads (
+    id uuid primary key default gen_random_uuid(),
+    content_hash varchar(64) not null unique,
+    records_hash varchar(64),
+    filename text not null,
+    job_id uuid not null references upload_jobs(id) on delete cascade,
+    uploaded_by uuid references users(id) on delete set null,
+    created_at timestamp default now()
+);
+create index if not exists ix_stock_uploads_records_hash on stock_uploads (records_hash);
+
+-- ===============================
+-- 🗂️ Stock Batches Table (one snapshot per upload)
+-- ===============================
+create table if not exists stock_batches (
+    id uuid primary key default gen_random_uuid(),
+    job_id uuid references upload_jobs(id) on delete set null,
+    status varchar(16) not null default 'pending',
+    row_count integer not null default 0,
+    created_at timestamp default now(),
+    activated_at timestamp,
+    superseded_at timestamp
+);
+create unique index if not exists uq_stock_batches_current on stock_batches (status) where status = 'current';
+
+alter table stocks_data add column if not exists batch_id uuid references stock_batches(id) on delete cascade;
+create index if not exists ix_stocks_data_batch_party_keyset on stocks_data (batch_id, party_id, uploaded_on, id);
+create index if not exists ix_stocks_data_batch_party_product on stocks_data (batch_id, party_id, product, id);
+create index if not exists ix_stocks_data_batch_party_chamber_id on stocks_data (batch_id, party_id, chamber, id);
+create index if not exists ix_stocks_data_batch_party_lot on stocks_data (batch_id, party_id, lot_no, id);
+create index if not exists ix_stocks_data_batch_party_date on stocks_data (batch_id, party_id, date, id);
+create index if not exists ix_stocks_data_batch_party_quantity on stocks_data (batch_id, party_id, quantity, id);
+create index if not exists ix_stocks_data_batch_party_weight on stocks_data (batch_id, party_id, weight_kgs, id);
+
+-- Trigram indexes for stock search: ILIKE 'q%' (autocomplete) and ILIKE '%q%' (substring)
+create extension if not exists pg_trgm;
+create index if not exists ix_stocks_data_lot_no_trgm on stocks_data using gin (lot_no gin_trgm_ops);
+create index if not exists ix_stocks_data_mark_trgm on stocks_data using gin (mark gin_trgm_ops);
+create index if not exists ix_stocks_data_lorry_trgm on stocks_data using gin (lorry gin_trgm_ops);
+create index if not exists ix_stocks_data_product_trgm on stocks_data using gin (product gin_trgm_ops);
+create index if not exists ix_stocks_data_party_name_trgm on stocks_data using gin (party_name gin_trgm_ops);
+
+-- ===============================
+-- 🧮 Stock Summaries Table (per-batch client totals)
+-- ===============================
+create table if not exists stock_summaries (
+    batch_id uuid not null references stock_batches(id) on delete cascade,
+    party_id text not null references clients(party_id) on delete cascade,
+    dimension varchar(16) not null,
+    value text not null,
+    rows integer not null default 0,
+    quantity bigint not null default 0,
+    weight_kgs double precision not null default 0,
+    primary key (batch_id, party_id, dimension, value)
+);
+
+-- ===============================
+-- 📈 Stock History Table (per-upload product rollups)
+-- ===============================
+create table if not exists stock_history (
+    batch_id uuid not null references stock_batches(id) on delete cascade,
+    party_id text not null references clients(party_id) on delete cascade,
+    product text not null,
+    recorded_on timestamp not null,
+    rows integer not null default 0,
+    quantity bigint not null default 0,
+    weight_kgs double precision not null default 0,
+    primary key (batch_id, party_id, product)
+);
+create index if not exists ix_stock_history_party_recorded on stock_history (party_id, recorded_on);
+create index if not exists ix_stock_history_recorded on stock_history (recorded_on);
+
+-- Backfill from the product summaries of batches activated before stock_history existed
+insert into stock_history (batch_id, party_id, product, recorded_on, rows, quantity, weight_kgs)
+select s.batch_id, s.party_id, s.value, b.activated_at, s.rows, s.quantity, s.weight_kgs
+from stock_summaries s
+join stock_batches b on b.id = s.batch_id
+where s.dimension = 'product' and b.activated_at is not null
+on conflict do nothing;
+
 -- ===============================
 -- 📌 Optional Tables (Remind Later)
 -- ===============================
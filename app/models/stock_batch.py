@@ -0,0 +1,40 @@
+# app/models/stock_batch.py
+# ------------------------------------------------------------
+# SQLAlchemy model for the stock_batches table (one snapshot per upload)
+# ------------------------------------------------------------
+
+from app.extensions import db
+import uuid
+from datetime import datetime
+
+
+class StockBatch(db.Model):
+    __tablename__ = 'stock_batches'
+
+    # Batch lifecycle: pending -> current -> superseded -> purged (rows deleted)
+    STATUS_PENDING = "pending"
+    STATUS_CURRENT = "current"
+    STATUS_SUPERSEDED = "superseded"
+    STATUS_PURGED = "purged"
+
+    id = db.Column(db.Uuid, primary_key=True, default=uuid.uuid4)
+    job_id = db.Column(
+        db.Uuid,
+        db.ForeignKey('upload_jobs.id', ondelete='SET NULL'),
+        nullable=True
+    )
+    status = db.Column(db.String(16), nullable=False, default=STATUS_PENDING)
+    row_count = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    activated_at = db.Column(db.DateTime, nullable=True)
+    superseded_at = db.Column(db.DateTime, nullable=True)
+
+    __table_args__ = (
+        # At most one current snapshot
+        db.Index(
+            'uq_stock_batches_current', 'status',
+            unique=True,
+            postgresql_where=db.text("status = 'current'"),
+            sqlite_where=db.text("status = 'current'")
+        ),
+    )
@@ -0,0 +1,35 @@
+# app/models/stock_history.py
+# ------------------------------------------------------------
+# SQLAlchemy model for the stock_history table (per-upload product rollups)
+# ------------------------------------------------------------
+
+from app.extensions import db
+
+
+class StockHistory(db.Model):
+    __tablename__ = 'stock_history'
+
+    # One row per activated batch, party and product; kept when the batch's stock rows are purged
+    batch_id = db.Column(
+        db.Uuid,
+        db.ForeignKey('stock_batches.id', ondelete='CASCADE'),
+        primary_key=True
+    )
+    party_id = db.Column(
+        db.String,
+        db.ForeignKey('clients.party_id', ondelete='CASCADE'),
+        primary_key=True
+    )
+    product = db.Column(db.String, primary_key=True)  # "" for blank cells
+    recorded_on = db.Column(db.DateTime, nullable=False)  # when the batch became current
+
+    rows = db.Column(db.Integer, nullable=False, default=0)
+    quantity = db.Column(db.BigInteger, nullable=False, default=0)  # bags
+    weight_kgs = db.Column(db.Float, nullable=False, default=0)
+
+    __table_args__ = (
+        # Time-range reads per party
+        db.Index('ix_stock_history_party_recorded', 'party_id', 'recorded_on'),
+        # Time-range reads across parties (admins)
+        db.Index('ix_stock_history_recorded', 'recorded_on'),
+    )
@@ -0,0 +1,31 @@
+# app/models/stock_summary.py
+# ------------------------------------------------------------
+# SQLAlchemy model for the stock_summaries table (per-batch client totals)
+# ------------------------------------------------------------
+
+from app.extensions import db
+
+
+class StockSummary(db.Model):
+    __tablename__ = 'stock_summaries'
+
+    # Columns stock totals are grouped by
+    DIMENSIONS = ("product", "chamber", "bank")
+
+    # One row per batch, party, dimension and value; the key is the client read path
+    batch_id = db.Column(
+        db.Uuid,
+        db.ForeignKey('stock_batches.id', ondelete='CASCADE'),
+        primary_key=True
+    )
+    party_id = db.Column(
+        db.String,
+        db.ForeignKey('clients.party_id', ondelete='CASCADE'),
+        primary_key=True
+    )
+    dimension = db.Column(db.String(16), primary_key=True)
+    value = db.Column(db.String, primary_key=True)  # "" for blank cells
+
+    rows = db.Column(db.Integer, nullable=False, default=0)
+    quantity = db.Column(db.BigInteger, nullable=False, default=0)  # bags
+    weight_kgs = db.Column(db.Float, nullable=False, default=0)
@@ -0,0 +1,35 @@
+# app/models/stock_upload.py
+# ------------------------------------------------------------
+# SQLAlchemy model for the stock_uploads table (uploaded workbook fingerprints)
+# ------------------------------------------------------------
+
+from app.extensions import db
+import uuid
+from datetime import datetime
+
+
+class StockUpload(db.Model):
+    __tablename__ = 'stock_uploads'
+
+    id = db.Column(db.Uuid, primary_key=True, default=uuid.uuid4)
+
+    # SHA-256 of the raw file bytes; a repeat upload is answered from the earlier job while its batch is current
+    content_hash = db.Column(db.String(64), unique=True, nullable=False)
+
+    # SHA-256 of the normalized parsed records (set after parsing, when enabled)
+    records_hash = db.Column(db.String(64), nullable=True, index=True)
+
+    filename = db.Column(db.String, nullable=False)
+    job_id = db.Column(
+        db.Uuid,
+        db.ForeignKey('upload_jobs.id', ondelete='CASCADE'),
+        nullable=False
+    )
+    uploaded_by = db.Column(
+        db.Uuid,
+        db.ForeignKey('users.id', ondelete='SET NULL'),
+        nullable=True
+    )
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    job = db.relationship("UploadJob")
@@ -7,6 +7,14 @@ from datetime import datetime
 class StocksData(db.Model):
     __tablename__ = 'stocks_data'
 
+    # Columns clients may filter on (equality / IN) and sort by
+    FILTER_KEYS = ("product", "chamber", "floor", "lot_no")
+    SORT_KEYS = ("uploaded_on", "date", "product", "lot_no", "chamber", "quantity", "weight_kgs")
+    # Sort keys left NULL by blank cells; blank text cells (e.g. chamber) are stored as ""
+    NULLABLE_SORT_KEYS = ("date", "quantity", "weight_kgs")
+    # Columns matched by stock search and autocomplete (trigram-indexed on PostgreSQL)
+    SEARCH_KEYS = ("lot_no", "mark", "lorry", "product", "party_name")
+
     id = db.Column(db.Uuid, primary_key=True, default=uuid.uuid4)
 
     # Foreign key to clients
@@ -40,3 +48,24 @@ class StocksData(db.Model):
         db.ForeignKey('users.id', ondelete='SET NULL'),
         nullable=True
     )
+
+    # Upload batch (snapshot) this row belongs to; NULL for rows loaded before batches
+    batch_id = db.Column(
+        db.Uuid,
+        db.ForeignKey('stock_batches.id', ondelete='CASCADE'),
+        nullable=True
+    )
+
+    __table_args__ = (
+        # Client reads: one party's rows within the current batch, newest first,
+        # paged by the (uploaded_on, id) keyset
+        db.Index('ix_stocks_data_batch_party_keyset', 'batch_id', 'party_id', 'uploaded_on', 'id'),
+        # Client filters and sorts, each scoped to one party's rows in a batch;
+        # one (column, id) keyset index per SORT_KEYS column
+        db.Index('ix_stocks_data_batch_party_product', 'batch_id', 'party_id', 'product', 'id'),
+        db.Index('ix_stocks_data_batch_party_chamber_id', 'batch_id', 'party_id', 'chamber', 'id'),
+        db.Index('ix_stocks_data_batch_party_lot', 'batch_id', 'party_id', 'lot_no', 'id'),
+        db.Index('ix_stocks_data_batch_party_date', 'batch_id', 'party_id', 'date', 'id'),
+        db.Index('ix_stocks_data_batch_party_quantity', 'batch_id', 'party_id', 'quantity', 'id'),
+        db.Index('ix_stocks_data_batch_party_weight', 'batch_id', 'party_id', 'weight_kgs', 'id'),
+    )
@@ -0,0 +1,48 @@
+# app/models/upload_job.py
+# ------------------------------------------------------------
+# SQLAlchemy model for the upload_jobs table (background stock ingestion)
+# ------------------------------------------------------------
+
+from app.extensions import db
+import uuid
+from datetime import datetime
+
+
+class UploadJob(db.Model):
+    __tablename__ = 'upload_jobs'
+
+    # Job lifecycle: queued -> running -> completed | failed
+    STATUS_QUEUED = "queued"
+    STATUS_RUNNING = "running"
+    STATUS_COMPLETED = "completed"
+    STATUS_FAILED = "failed"
+
+    id = db.Column(db.Uuid, primary_key=True, default=uuid.uuid4)
+    filename = db.Column(db.String, nullable=False)
+    file_path = db.Column(db.String, nullable=False)
+    status = db.Column(db.String(16), nullable=False, default=STATUS_QUEUED)
+
+    # Progress counters, updated as chunks are parsed and inserted
+    rows_parsed = db.Column(db.Integer, nullable=False, default=0)
+    rows_inserted = db.Column(db.Integer, nullable=False, default=0)
+    rows_skipped = db.Column(db.Integer, nullable=False, default=0)
+    error = db.Column(db.Text, nullable=True)
+
+    # Per-sheet outcome: [{"file", "sheet", "status", "rows", "error"}, ...]
+    sheets = db.Column(db.JSON, nullable=True)
+
+    # Earlier job whose parsed records were identical; this job inserted nothing
+    duplicate_of = db.Column(
+        db.Uuid,
+        db.ForeignKey('upload_jobs.id', ondelete='SET NULL'),
+        nullable=True
+    )
+
+    created_by = db.Column(
+        db.Uuid,
+        db.ForeignKey('users.id', ondelete='SET NULL'),
+        nullable=True
+    )
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
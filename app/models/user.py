@@ -6,7 +6,7 @@
 from app.extensions import db
 import uuid
 from datetime import datetime
-from werkzeug.security import generate_password_hash, check_password_hash
+from app.services.password_hasher import hash_password, needs_rehash, verify_password
 
 
 class User(db.Model):
@@ -23,7 +23,10 @@ class User(db.Model):
     admin = db.relationship("Admin", back_populates="user", uselist=False)
     
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = hash_password(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
\ No newline at end of file
+        return verify_password(self.password_hash, password)
+
+    def password_needs_rehash(self):
+        return needs_rehash(self.password_hash)
\ No newline at end of file
@@ -1,16 +1,42 @@
 # ✅ UPDATED ADMIN ROUTES TO USE COOKIE-BASED JWT AUTH
 
+import hashlib
+import shutil
+import tempfile
+import uuid
+from pathlib import Path
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import get_jwt, get_jwt_identity, jwt_required
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload, load_only
+from marshmallow import ValidationError
 from app.extensions import db
 from app.models.user import User
 from app.models.client import Client
 from app.schemas.user_schema import CreateUserSchema
 from app.schemas.client_schema import ClientResponseSchema
-from werkzeug.security import generate_password_hash
+from werkzeug.utils import secure_filename
+from app.config.config_loader import config_loader
 from app.config.logger_loader import app_logger
 from app.utils.helpers import StockParseError, StockParser, helpers
-from app.models.stocks_data import StocksData
+from app.models.upload_job import UploadJob
+from app.models.stock_upload import StockUpload
+from app.schemas.upload_job_schema import UploadJobResponseSchema
+from app.models.stock_batch import StockBatch
+from app.schemas.stock_batch_schema import StockBatchResponseSchema, PurgeStockBatchesSchema
+from app.services import stock_search, stock_service
+from app.services.party_resolver import find_conflicting_party
+from app.services.principal_cache import invalidate_principal
+from app.services.stock_cache import get_stock_cache
+from app.services.stock_export import export_response
+from app.schemas.stocks_data_schema import (
+    STOCK_RESPONSE_FIELDS,
+    AdminStockExportQuerySchema,
+    StockHistoryQuerySchema,
+    StockSearchQuerySchema,
+    StocksDataResponseSchema
+)
+from app.tasks import enqueue_stock_ingestion
+from app.utils.decorators import admin_required, current_principal
 from app.models.admin import Admin
 from app.schemas.admin_schema import AdminResponseSchema
 
@@ -18,17 +44,9 @@ from app.schemas.admin_schema import AdminResponseSchema
 admin_bp = Blueprint("admin", __name__)
 
 
-def is_admin():
-    jwt_data = get_jwt()
-    return jwt_data.get("role") == "admin"
-
-
 @admin_bp.route("/create-admin", methods=["POST"])
-@jwt_required(locations=["cookies"])
+@admin_required
 def create_admin():
-    if not is_admin():
-        return jsonify({"error": "Admin access required"}), 403
-
     data = request.get_json()
     if not data:
         return jsonify({"error": "No input data provided"}), 400
@@ -50,7 +68,7 @@ def create_admin():
     # Create User (role = admin)
     user = User(email=email, role="admin")
     generated_password = helpers.generate_password(4)
-    user.password_hash = generate_password_hash(generated_password)
+    user.set_password(generated_password)
 
     db.session.add(user)
     db.session.flush()  # To get user.id before admin insert
@@ -74,47 +92,36 @@ def create_admin():
 
 
 @admin_bp.route("/get-admin-info", methods=["GET"])
-@jwt_required(locations=["cookies"])
+@admin_required
 def get_admin_profile():
-    user_id = get_jwt_identity()
-
-    user = User.query.get(user_id)
-    if not user or user.role != "admin":
-        return jsonify({"error": "Admin not found"}), 404
-
-    admin = Admin.query.filter_by(user_id=user.id).first()
-    if not admin:
+    # The principal carries the dumped admin profile, so a warm cache needs no query
+    profile = current_principal().profile
+    if profile is None:
         return jsonify({"error": "Admin profile not found"}), 404
 
-    schema = AdminResponseSchema()
-    return jsonify(schema.dump(admin)), 200
+    return jsonify(profile), 200
 
 
 @admin_bp.route("/list-admins", methods=["GET"])
-@jwt_required(locations=["cookies"])
+@admin_required
 def list_admins():
-    if not is_admin():
-        return jsonify({"error": "Admin access required"}), 403
+    try:
+        only = helpers.parse_fields(request.args.get("fields"), AdminResponseSchema().fields)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
-    admins = Admin.query.all()
-    schema = AdminResponseSchema(many=True)
+    admins = _projected_query(Admin, only).all()
+    schema = AdminResponseSchema(many=True, only=only)
     return jsonify(schema.dump(admins)), 200
 
 
 @admin_bp.route("/update-admin-profile", methods=["PATCH"])
-@jwt_required(locations=["cookies"])
+@admin_required
 def update_admin_profile():
-    if not is_admin():
-        return jsonify({"error": "Admin access required"}), 403
-
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-    if not user:
-        return jsonify({"error": "User not found"}), 404
-
-    admin = Admin.query.filter_by(user_id=user.id).first()
+    admin = Admin.query.options(joinedload(Admin.user)).filter_by(user_id=current_principal().user_id).first()
     if not admin:
         return jsonify({"error": "Admin not found"}), 404
+    user = admin.user
 
     data = request.get_json()
     if not data:
@@ -146,15 +153,13 @@ def update_admin_profile():
         admin.mobile_number = mobile
 
     db.session.commit()
+    invalidate_principal(user.id)
     return jsonify({"message": "Admin profile updated successfully."}), 200
 
 
 @admin_bp.route("/update-admin-password", methods=["PATCH"])
-@jwt_required(locations=["cookies"])
+@admin_required
 def update_admin_password():
-    if not is_admin():
-        return jsonify({"error": "Admin access required"}), 403
-
     data = request.get_json()
     if not data:
         return jsonify({"error": "No data provided"}), 400
@@ -162,8 +167,7 @@ def update_admin_password():
     current_password = data.get("current_password")
     new_password = data.get("new_password")
 
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    user = db.session.get(User, current_principal().user_id)
     if not user:
         return jsonify({"error": "User not found"}), 404
 
@@ -177,11 +181,8 @@ def update_admin_password():
 
 
 @admin_bp.route("/reset-admin-password/<string:admin_id>", methods=["POST"])
-@jwt_required(locations=["cookies"])
+@admin_required
 def reset_admin_password(admin_id):
-    if not is_admin():
-        return jsonify({"error": "Admin access required"}), 403
-
     admin = Admin.query.filter_by(admin_id=admin_id).first()
     if not admin:
         return jsonify({"error": "Admin not found"}), 404
@@ -202,11 +203,8 @@ def reset_admin_password(admin_id):
 
 
 @admin_bp.route("/deactivate-admin/<string:admin_id>", methods=["PATCH"])
-@jwt_required(locations=["cookies"])
+@admin_required
 def deactivate_admin(admin_id):
-    if not is_admin():
-        return jsonify({"error": "Admin access required"}), 403
-
     admin = Admin.query.filter_by(admin_id=admin_id).first()
     if not admin:
         return jsonify({"error": "Admin not found"}), 404
@@ -217,16 +215,14 @@ def deactivate_admin(admin_id):
 
     user.is_active = False
     db.session.commit()
+    invalidate_principal(user.id)
 
     return jsonify({"message": "Admin deactivated successfully"}), 200
 
 
 @admin_bp.route("/reactivate-admin/<string:admin_id>", methods=["PATCH"])
-@jwt_required(locations=["cookies"])
+@admin_required
 def reactivate_admin(admin_id):
-    if not is_admin():
-        return jsonify({"error": "Admin access required"}), 403
-
     admin = Admin.query.filter_by(admin_id=admin_id).first()
     if not admin:
         return jsonify({"error": "Admin not found"}), 404
@@ -237,16 +233,14 @@ def reactivate_admin(admin_id):
 
     user.is_active = True
     db.session.commit()
+    invalidate_principal(user.id)
 
     return jsonify({"message": "Admin reactivated successfully"}), 200
 
 
 @admin_bp.route("/create-client", methods=["POST"])
-@jwt_required(locations=["cookies"])
+@admin_required
 def create_client():
-    if not is_admin():
-        return jsonify({"error": "Admin access required"}), 403
-
     data = request.get_json()
 
     user_schema = CreateUserSchema()
@@ -265,13 +259,15 @@ def create_client():
 
     if Client.query.filter_by(party_id=data["party_id"]).first():
         return jsonify({"error": "party_id already exists"}), 400
+    if find_conflicting_party(data["party_name"]):
+        return jsonify({"error": "party_name matches an existing party"}), 400
     if User.query.filter_by(email=data["email"]).first():
         return jsonify({"error": "Email already exists"}), 400
 
     # Create user
     new_user = User(email=data["email"], role="client")
     new_password = helpers.generate_password(4)
-    new_user.password_hash = generate_password_hash(new_password)
+    new_user.set_password(new_password)
 
     db.session.add(new_user)
     db.session.flush()
@@ -294,22 +290,42 @@ def create_client():
 
 
 @admin_bp.route("/list-clients", methods=["GET"])
-@jwt_required(locations=["cookies"])
+@admin_required
 def list_clients():
-    if not is_admin():
-        return jsonify({"error": "Admin access required"}), 403
+    try:
+        only = helpers.parse_fields(request.args.get("fields"), ClientResponseSchema().fields)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
-    clients = Client.query.all()
-    client_schema = ClientResponseSchema(many=True)
+    clients = _projected_query(Client, only).all()
+    client_schema = ClientResponseSchema(many=True, only=only)
     return jsonify(client_schema.dump(clients)), 200
 
 
+# Listing fields served from the linked users row
+USER_FIELDS = {"email": User.email, "status": User.is_active}
+
+
+def _projected_query(model, only):
+    """
+    Query for Admin or Client rows that selects only the columns behind the requested fields.
+
+    The linked user is joined in the same query when email or status is needed.
+    """
+    if only is None:
+        return model.query.options(joinedload(model.user))
+
+    columns = [getattr(model, name) for name in only if name not in USER_FIELDS]
+    options = [load_only(*(columns or [model.id]))]
+    user_columns = [USER_FIELDS[name] for name in only if name in USER_FIELDS]
+    if user_columns:
+        options.append(joinedload(model.user).load_only(*user_columns))
+    return model.query.options(*options)
+
+
 @admin_bp.route("/reset-client-password/<string:party_id>", methods=["POST"])
-@jwt_required(locations=["cookies"])
+@admin_required
 def reset_client_password(party_id):
-    if not is_admin():
-        return jsonify({"error": "Admin access required"}), 403
-
     # Get client and related user
     client = Client.query.filter_by(party_id=party_id).first()
     if not client:
@@ -321,7 +337,7 @@ def reset_client_password(party_id):
 
     # Generate new password and update
     new_password = helpers.generate_password(4)
-    user.password_hash = generate_password_hash(new_password)
+    user.set_password(new_password)
 
     db.session.commit()
 
@@ -333,70 +349,225 @@ def reset_client_password(party_id):
 
 
 @admin_bp.route("/upload-stocks", methods=["POST"])
-@jwt_required(locations=["cookies"])
+@admin_required
 def upload_stocks():
-    if not is_admin():
-        return jsonify({"error": "Admin access required"}), 403
-
-    uploaded_file = request.files.get("file")
-    if not uploaded_file:
+    # Accepts one or more Excel (every sheet is loaded), CSV or Parquet files and/or ZIP archives of them.
+    uploaded_files = [f for f in request.files.getlist("file") + request.files.getlist("files") if f.filename]
+    if not uploaded_files:
         return jsonify({"error": "No file uploaded"}), 400
 
-    if not uploaded_file.filename.endswith((".xlsx", ".xls")):
-        return jsonify({"error": "Invalid file format. Only .xlsx or .xls allowed."}), 400
+    allowed = StockParser.SOURCE_SUFFIXES + StockParser.ARCHIVE_SUFFIXES
+    if not all(f.filename.lower().endswith(allowed) for f in uploaded_files):
+        return jsonify({"error": "Invalid file format. Only .xlsx, .xls, .csv, .parquet or .zip allowed."}), 400
+
+    # Dry run: validate the whole upload in one pass and report, without writing anything.
+    dry_run = request.values.get("dry_run", "").strip().lower() in ("1", "true", "yes")
+    if dry_run:
+        return _validate_upload(uploaded_files)
+
+    # Store the files and hand them to a background worker; the client polls the job.
+    job_id = uuid.uuid4()
+    upload_dir = Path(config_loader.config.get("uploads", {}).get("filepath", "uploads"))
+    job_dir = upload_dir / str(job_id)
+    helpers.ensure_directory_exists(job_dir)
+    file_hashes = [
+        helpers.save_and_hash(f, job_dir / f"{index:04d}_{secure_filename(f.filename) or 'upload'}")
+        for index, f in enumerate(uploaded_files)
+    ]
+    # A single file keeps its own hash; a set of files is fingerprinted regardless of order
+    if len(file_hashes) == 1:
+        content_hash = file_hashes[0]
+    else:
+        content_hash = hashlib.sha256("".join(sorted(file_hashes)).encode()).hexdigest()
+    filename = ", ".join(f.filename for f in uploaded_files)
+
+    # The same file(s) are the current stocks already: answer with that job, skip parsing.
+    existing = StockUpload.query.filter_by(content_hash=content_hash).first()
+    if existing:
+        if stock_service.job_serves_current_batch(existing.job):
+            shutil.rmtree(job_dir, ignore_errors=True)
+            return _duplicate_upload_response(existing)
+        # A later upload replaced them: forget the old fingerprint and ingest again
+        db.session.delete(existing)
+        db.session.flush()
+
+    uploaded_by = current_principal().user_id
+    job = UploadJob(
+        id=job_id,
+        filename=filename,
+        file_path=str(job_dir),
+        status=UploadJob.STATUS_QUEUED,
+        created_by=uploaded_by
+    )
+    db.session.add(job)
+    db.session.add(StockUpload(
+        content_hash=content_hash,
+        filename=filename,
+        job_id=job.id,
+        uploaded_by=uploaded_by
+    ))
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # The same file was accepted concurrently
+        db.session.rollback()
+        shutil.rmtree(job_dir, ignore_errors=True)
+        existing = StockUpload.query.filter_by(content_hash=content_hash).first()
+        if existing is None:
+            # That upload has since failed and released the file
+            return jsonify({"error": "A concurrent upload of this file failed. Please upload it again."}), 409
+        return _duplicate_upload_response(existing)
+
+    enqueue_stock_ingestion(job.id)
+
+    return jsonify({
+        "message": "Stock upload accepted for processing.",
+        "job_id": str(job.id),
+        "status": job.status
+    }), 202
+
+
+def _validate_upload(uploaded_files):
+    with tempfile.TemporaryDirectory(prefix="stock-dry-run-") as upload_dir:
+        sources = []
+        for index, f in enumerate(uploaded_files):
+            file_path = Path(upload_dir) / f"{index:04d}_{secure_filename(f.filename) or 'upload'}"
+            f.save(file_path)
+            sources.append((f.filename, str(file_path)))
+
+        try:
+            report = stock_service.validate_stock_files(sources)
+        except StockParseError as e:
+            return jsonify({"error": str(e)}), 400
+        except Exception:
+            app_logger.exception("Stock upload dry run failed:")
+            return jsonify({"error": "Internal server error while validating stocks."}), 500
+
+    return jsonify({"dry_run": True, **report}), 200
+
+
+def _duplicate_upload_response(upload):
+    job = upload.job
+    if job.duplicate_of:
+        job = db.session.get(UploadJob, job.duplicate_of)
+    return jsonify({
+        "message": "This file was already uploaded.",
+        "duplicate": True,
+        "job_id": str(job.id),
+        "status": job.status,
+        "job": UploadJobResponseSchema().dump(job)
+    }), 200
+
 
+@admin_bp.route("/upload-jobs/<string:job_id>", methods=["GET"])
+@admin_required
+def get_upload_job(job_id):
     try:
-        parsed_data = StockParser.extract_stock_data(uploaded_file)
-        print(parsed_data)
-        if not parsed_data:
-            return jsonify({"error": "No stock data found in file."}), 400
-
-        uploaded_by = get_jwt_identity()
-        print(uploaded_by)
-        for record in parsed_data:
-            party_name = record["party_name"]
-            print("party_name", party_name)
-            client = Client.query.filter_by(party_name=party_name).first()
-            print(client)
-            if not client:
-                continue  # or collect for error reporting
-            print("party_name", party_name)
-            stock = StocksData(
-                party_id=client.party_id,
-                party_name=party_name,
-                bank=record["bank"],
-                lot_no=record["lot_no"],
-                date=record["date"],
-                mark=record["mark"],
-                lorry=record["lorry"],
-                product=record["product"],
-                packing=record["packing"],
-                quantity=record["quantity"],
-                weight_kgs=record["weight_kgs"],
-                chamber=record["chamber"],
-                floor=record["floor"],
-                bayee=record["bayee"],
-                uploaded_by=uploaded_by
-            )
-            db.session.add(stock)
+        job = db.session.get(UploadJob, uuid.UUID(job_id))
+    except ValueError:
+        job = None
+    if not job:
+        return jsonify({"error": "Upload job not found"}), 404
 
-        db.session.commit()
-        return jsonify({"message": "Stocks uploaded and saved successfully."}), 201
+    return jsonify(UploadJobResponseSchema().dump(job)), 200
 
-    except StockParseError as e:
-        return jsonify({"error": str(e)}), 400
 
-    except Exception as e:
-        app_logger.error(f"Stock upload error: {e}")
-        return jsonify({"error": "Internal server error while processing stocks."}), 500
+@admin_bp.route("/stock-batches", methods=["GET"])
+@admin_required
+def list_stock_batches():
+    batches = StockBatch.query.order_by(StockBatch.created_at.desc()).all()
+    return jsonify(StockBatchResponseSchema(many=True).dump(batches)), 200
+
+
+@admin_bp.route("/stock-batches/purge", methods=["POST"])
+@admin_required
+def purge_stock_batches():
+    try:
+        data = PurgeStockBatchesSchema().load(request.get_json(silent=True) or {})
+    except ValidationError as e:
+        return jsonify({"errors": e.messages}), 400
+
+    purged = stock_service.purge_superseded_batches(keep=data["keep"])
+    db.session.commit()
+    app_logger.info(f"Purged {purged} superseded stock batches (kept {data['keep']})")
+
+    return jsonify({"message": "Superseded stock batches purged.", "purged": purged}), 200
+
+
+@admin_bp.route("/stocks/export", methods=["GET"])
+@admin_required
+def export_stocks():
+    try:
+        query = AdminStockExportQuerySchema().load(request.args)
+    except ValidationError as err:
+        return jsonify({"errors": err.messages}), 400
+
+    party_id = query["party_id"]
+    if party_id and not Client.query.filter_by(party_id=party_id).first():
+        return jsonify({"error": "Client not found"}), 404
+
+    # Admin exports identify each row's party
+    columns = ["party_id", "party_name"] + [
+        name for name in STOCK_RESPONSE_FIELDS if name in (query["columns"] or STOCK_RESPONSE_FIELDS)
+    ]
+    batch_size = config_loader.config.get("stocks", {}).get("stream_batch_size", 1000)
+    stocks = stock_service.iter_export_stocks(party_id, filters=query, batch_size=batch_size)
+    return export_response(stocks, columns, query["format"], f"stocks_{party_id or 'all'}")
+
+
+@admin_bp.route("/stocks/history", methods=["GET"])
+@admin_required
+def get_stock_history():
+    try:
+        query = StockHistoryQuerySchema().load(request.args)
+    except ValidationError as err:
+        return jsonify({"errors": err.messages}), 400
+
+    party_id = query["party_id"]
+    if party_id and not Client.query.filter_by(party_id=party_id).first():
+        return jsonify({"error": "Client not found"}), 404
+
+    history = stock_service.stock_history(party_id, query["product"], query["date_from"], query["date_to"])
+    return jsonify({"party_id": party_id, **history}), 200
+
+
+@admin_bp.route("/stocks/search", methods=["GET"])
+@admin_required
+def search_stocks():
+    try:
+        query = StockSearchQuerySchema().load(request.args)
+    except ValidationError as err:
+        return jsonify({"errors": err.messages}), 400
+
+    stocks = stock_search.search_stocks(query["q"], query["party_id"], query["field"], query["limit"])
+    columns = ("party_id", "party_name") + STOCK_RESPONSE_FIELDS
+    return jsonify({
+        "q": query["q"],
+        "stocks": [StocksDataResponseSchema(only=columns).dump(stock) for stock in stocks]
+    }), 200
+
+
+@admin_bp.route("/stocks/autocomplete", methods=["GET"])
+@admin_required
+def autocomplete_stocks():
+    try:
+        query = StockSearchQuerySchema().load(request.args)
+    except ValidationError as err:
+        return jsonify({"errors": err.messages}), 400
+
+    suggestions = stock_search.autocomplete(query["q"], query["party_id"], query["field"], query["limit"])
+    return jsonify({"q": query["q"], "suggestions": suggestions}), 200
+
+
+@admin_bp.route("/stock-cache", methods=["GET"])
+@admin_required
+def get_stock_cache_stats():
+    return jsonify(get_stock_cache().stats()), 200
 
 
 @admin_bp.route("/update-client/<string:party_id>", methods=["PATCH"])
-@jwt_required(locations=["cookies"])
+@admin_required
 def update_client(party_id):
-    if not is_admin():
-        return jsonify({"error": "Admin access required"}), 403
-
     data = request.get_json()
     if not data:
         return jsonify({"error": "No data provided"}), 400
@@ -415,6 +586,8 @@ def update_client(party_id):
     mobile_number = data.get("mobile_number")
 
     if party_name:
+        if find_conflicting_party(party_name, client.party_id):
+            return jsonify({"error": "party_name matches an existing party"}), 400
         client.party_name = party_name
     if mobile_number:
         client.mobile_number = mobile_number
@@ -426,16 +599,14 @@ def update_client(party_id):
         user.email = email
 
     db.session.commit()
+    invalidate_principal(user.id)
 
     return jsonify({"message": "Client updated successfully"}), 200
 
 
 @admin_bp.route("/deactivate-client/<string:party_id>", methods=["PATCH"])
-@jwt_required(locations=["cookies"])
+@admin_required
 def deactivate_client(party_id):
-    if not is_admin():
-        return jsonify({"error": "Admin access required"}), 403
-
     client = Client.query.filter_by(party_id=party_id).first()
     if not client:
         return jsonify({"error": "Client not found"}), 404
@@ -446,16 +617,14 @@ def deactivate_client(party_id):
 
     user.is_active = False
     db.session.commit()
+    invalidate_principal(user.id)
 
     return jsonify({"message": "Client deactivated successfully"}), 200
 
 
 @admin_bp.route("/reactivate-client/<string:party_id>", methods=["PATCH"])
-@jwt_required(locations=["cookies"])
+@admin_required
 def reactivate_client(party_id):
-    if not is_admin():
-        return jsonify({"error": "Admin access required"}), 403
-
     client = Client.query.filter_by(party_id=party_id).first()
     if not client:
         return jsonify({"error": "Client not found"}), 404
@@ -466,5 +635,6 @@ def reactivate_client(party_id):
 
     user.is_active = True
     db.session.commit()
+    invalidate_principal(user.id)
 
     return jsonify({"message": "Client reactivated successfully"}), 200
@@ -9,21 +9,14 @@ from flask_jwt_extended import (
 from app.extensions import db
 from app.models.user import User
 from app.schemas.auth_schema import AdminRegisterSchema, LoginSchema
-from werkzeug.security import generate_password_hash, check_password_hash
 from marshmallow import ValidationError
 from app.config.logger_loader import app_logger
-from app.models.admin import Admin
-from app.models.client import Client
+from app.utils.decorators import current_principal, principal_required
 
 
 auth_bp = Blueprint("auth", __name__)
 
 
-def is_admin():
-    jwt_data = get_jwt()
-    return jwt_data.get("role") == "admin"
-
-
 @auth_bp.route("/ping", methods=["GET"])
 def ping():
     return {"message": "Auth service running"}
@@ -45,9 +38,14 @@ def login():
         if not user or not user.is_active:
             return jsonify({"error": "Invalid credentials."}), 401
 
-        if not check_password_hash(user.password_hash, password):
+        if not user.check_password(password):
             return jsonify({"error": "Incorrect password."}), 401
 
+        # Upgrade hashes made with older parameters while the password is at hand
+        if user.password_needs_rehash():
+            user.set_password(password)
+            db.session.commit()
+
         identity = {"user_id": str(user.id), "role": user.role}
         access_token = create_access_token(
             identity=str(user.id),
@@ -166,22 +164,14 @@ def register_admin():
 
 
 @auth_bp.route("/current-user", methods=["GET"])
-@jwt_required(locations=["cookies"])
+@principal_required
 def get_current_user():
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-    if not user:
-        return jsonify({"error": "User not found"}), 404
-
-    role = "Admin" if is_admin() else "Client"
-    name = None
+    principal = current_principal()
 
-    if role == "Admin":
-        admin = Admin.query.filter_by(user_id=user.id).first()
-        name = admin.admin_name if admin else "Admin"
+    if principal.role == "admin":
+        role, name = "Admin", principal.admin_name or "Admin"
     else:
-        client = Client.query.filter_by(user_id=user.id).first()
-        name = client.party_name if client else "Client"
+        role, name = "Client", principal.party_name or "Client"
 
     return jsonify({
         "name": name,
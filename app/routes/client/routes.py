@@ -1,48 +1,233 @@
-from flask import Blueprint, jsonify
-from flask_jwt_extended import get_jwt_identity, jwt_required
+import itertools
+import json
 
-from app.models.client import Client
-from app.models.stocks_data import StocksData
-from app.models.user import User
+from flask import Blueprint, current_app, jsonify, request, stream_with_context
+from marshmallow import ValidationError
+
+from app.config.config_loader import config_loader
+from app.schemas.stocks_data_schema import (
+    DICTIONARY_FIELDS,
+    STOCK_RESPONSE_FIELDS,
+    StockExportQuerySchema,
+    StockHistoryQuerySchema,
+    StockSearchQuerySchema,
+    StocksPageQuerySchema
+)
+from app.services import stock_search, stock_service
+from app.services.stock_cache import get_stock_cache
+from app.services.stock_export import export_response
+from app.utils.decorators import client_required, current_principal
 
 client_bp = Blueprint("client", __name__)
 
+NDJSON_MIMETYPE = "application/x-ndjson"
+
 @client_bp.route("/ping", methods=["GET"])
 def ping():
     return {"message": "Client service running"}
 
 
 @client_bp.route("/stocks", methods=["GET"])
-@jwt_required(locations=["cookies"])
+@client_required
 def get_client_stocks():
-    identity = get_jwt_identity()
-    user = User.query.get(identity)
-
-    if not user or user.role != "client":
-        return jsonify({"error": "Unauthorized"}), 403
-
-    client = Client.query.filter_by(user_id=user.id).first()
-    if not client:
-        return jsonify({"error": "Client not found"}), 404
-
-    stocks = StocksData.query.filter_by(party_id=client.party_id).order_by(StocksData.uploaded_on.desc()).all()
-
-    result = []
-    for stock in stocks:
-        result.append({
-            "product": stock.product,
-            "quantity": stock.quantity,
-            "lot_no": stock.lot_no,
-            "date": stock.date.isoformat() if stock.date else None,
-            "packing": stock.packing,
-            "weight_kgs": stock.weight_kgs,
-            "bank": stock.bank,
-            "mark": stock.mark,
-            "lorry": stock.lorry,
-            "chamber": stock.chamber,
-            "floor": stock.floor,
-            "bayee": stock.bayee,
-            "uploaded_on": stock.uploaded_on.isoformat(),
-        })
-
-    return jsonify({"stocks": result}), 200
+    client = current_principal()
+
+    try:
+        query = StocksPageQuerySchema().load(request.args)
+    except ValidationError as err:
+        return jsonify({"errors": err.messages}), 400
+
+    # Streaming modes send every matching row (or `limit` rows) as it is read
+    ndjson = request.accept_mimetypes.best_match(["application/json", NDJSON_MIMETYPE]) == NDJSON_MIMETYPE
+    columns = [name for name in STOCK_RESPONSE_FIELDS if name in (query["columns"] or STOCK_RESPONSE_FIELDS)]
+    if ndjson or query["stream"]:
+        if query["format"] == "columnar":
+            return jsonify({"error": "The columnar format is only available for paged responses"}), 400
+        return _stream_stocks(client.party_id, query, columns, ndjson)
+
+    limit = query["limit"] or config_loader.config.get("stocks", {}).get("page_size", 100)
+
+    # Serve a cached body when this party's current snapshot was already rendered for this query
+    cache = get_stock_cache()
+    variant = (str(stock_service.current_batch_id()), tuple(sorted(request.args.items(multi=True))))
+    body = cache.get(client.party_id, variant)
+    if body is not None:
+        return _json_body(body, "HIT")
+
+    # Only the current upload snapshot is visible, one keyset page at a time
+    try:
+        stocks, next_cursor, total = stock_service.page_client_stocks(
+            client.party_id, limit, query["cursor"], query["include_total"],
+            filters=query, sort=query["sort"], columns=columns if query["columns"] else None
+        )
+    except ValueError:
+        return jsonify({"error": "Invalid cursor"}), 400
+
+    if query["format"] == "columnar":
+        result = _columnar_payload(stocks, columns)
+    else:
+        result = [_stock_payload(stock, columns) for stock in stocks]
+
+    response = {"format": query["format"], "stocks": result, "next_cursor": next_cursor, "limit": limit}
+    if total is not None:
+        response["total"] = total
+
+    body = jsonify(response).get_data()
+    cache.set(client.party_id, variant, body)
+    return _json_body(body, "MISS")
+
+
+@client_bp.route("/stocks/summary", methods=["GET"])
+@client_required
+def get_client_stock_summary():
+    client = current_principal()
+
+    return jsonify(stock_service.client_stock_summary(client.party_id)), 200
+
+
+@client_bp.route("/stocks/history", methods=["GET"])
+@client_required
+def get_client_stock_history():
+    client = current_principal()
+
+    try:
+        query = StockHistoryQuerySchema().load(request.args)
+    except ValidationError as err:
+        return jsonify({"errors": err.messages}), 400
+
+    history = stock_service.stock_history(
+        client.party_id, query["product"], query["date_from"], query["date_to"]
+    )
+    return jsonify(history), 200
+
+
+@client_bp.route("/stocks/search", methods=["GET"])
+@client_required
+def search_client_stocks():
+    client = current_principal()
+
+    try:
+        query = StockSearchQuerySchema().load(request.args)
+    except ValidationError as err:
+        return jsonify({"errors": err.messages}), 400
+
+    # Clients only ever search their own party's current snapshot
+    stocks = stock_search.search_stocks(query["q"], client.party_id, query["field"], query["limit"])
+    return jsonify({"q": query["q"], "stocks": [_stock_payload(stock) for stock in stocks]}), 200
+
+
+@client_bp.route("/stocks/autocomplete", methods=["GET"])
+@client_required
+def autocomplete_client_stocks():
+    client = current_principal()
+
+    try:
+        query = StockSearchQuerySchema().load(request.args)
+    except ValidationError as err:
+        return jsonify({"errors": err.messages}), 400
+
+    suggestions = stock_search.autocomplete(query["q"], client.party_id, query["field"], query["limit"])
+    return jsonify({"q": query["q"], "suggestions": suggestions}), 200
+
+
+@client_bp.route("/stocks/export", methods=["GET"])
+@client_required
+def export_client_stocks():
+    client = current_principal()
+
+    try:
+        query = StockExportQuerySchema().load(request.args)
+    except ValidationError as err:
+        return jsonify({"errors": err.messages}), 400
+
+    columns = [name for name in STOCK_RESPONSE_FIELDS if name in (query["columns"] or STOCK_RESPONSE_FIELDS)]
+    batch_size = config_loader.config.get("stocks", {}).get("stream_batch_size", 1000)
+    try:
+        stocks = stock_service.iter_client_stocks(
+            client.party_id, query["cursor"], filters=query, sort=query["sort"],
+            limit=query["limit"], batch_size=batch_size
+        )
+        first = next(stocks, None)
+    except ValueError:
+        return jsonify({"error": "Invalid cursor"}), 400
+
+    rows = stocks if first is None else itertools.chain([first], stocks)
+    return export_response(rows, columns, query["format"], f"stocks_{client.party_id}")
+
+
+def _stream_stocks(party_id, query, columns, ndjson):
+    """
+    Streams stock rows from a server-side cursor as NDJSON lines or as one
+    chunked {"stocks": [...]} document, writing each fetched batch as soon as it is serialized.
+    """
+    batch_size = config_loader.config.get("stocks", {}).get("stream_batch_size", 1000)
+    try:
+        stocks = stock_service.iter_client_stocks(
+            party_id, query["cursor"], filters=query, sort=query["sort"],
+            limit=query["limit"], batch_size=batch_size, columns=columns if query["columns"] else None
+        )
+        first = next(stocks, None)
+    except ValueError:
+        return jsonify({"error": "Invalid cursor"}), 400
+
+    def generate():
+        rows = [] if first is None else [first]
+        separator = "" if ndjson else "\n"
+        if not ndjson:
+            yield '{"stocks": ['
+        for stock in stocks:
+            rows.append(stock)
+            if len(rows) == batch_size:
+                yield _encode_rows(rows, columns, ndjson, separator)
+                separator = ",\n"
+                rows = []
+        if rows:
+            yield _encode_rows(rows, columns, ndjson, separator)
+        if not ndjson:
+            yield "]}"
+
+    mimetype = NDJSON_MIMETYPE if ndjson else "application/json"
+    return current_app.response_class(stream_with_context(generate()), status=200, mimetype=mimetype)
+
+
+def _encode_rows(stocks, columns, ndjson, separator):
+    lines = [json.dumps(_stock_payload(stock, columns)) for stock in stocks]
+    if ndjson:
+        return "\n".join(lines) + "\n"
+    return separator + ",\n".join(lines)
+
+
+def _stock_payload(stock, columns=STOCK_RESPONSE_FIELDS):
+    payload = {}
+    for name in columns:
+        value = getattr(stock, name)
+        payload[name] = value.isoformat() if name in ("date", "uploaded_on") and value else value
+    return payload
+
+
+def _columnar_payload(stocks, columns):
+    """
+    Encodes stock rows as one array per column.
+
+    DICTIONARY_FIELDS columns hold indexes into a per-column list of distinct
+    values (null stays null), so each repeated product, bank or date is sent once.
+    """
+    schema, data, dictionaries = [], {}, {}
+    payloads = [_stock_payload(stock, columns) for stock in stocks]
+    for name in columns:
+        values = [payload[name] for payload in payloads]
+        if name in DICTIONARY_FIELDS:
+            codes = {}
+            data[name] = [None if value is None else codes.setdefault(value, len(codes)) for value in values]
+            dictionaries[name] = list(codes)
+            schema.append({"name": name, "encoding": "dictionary"})
+        else:
+            data[name] = values
+            schema.append({"name": name, "encoding": "plain"})
+    return {"count": len(payloads), "schema": schema, "dictionaries": dictionaries, "data": data}
+
+
+def _json_body(body, cache_status):
+    response = current_app.response_class(body, status=200, mimetype="application/json")
+    response.headers["X-Cache"] = cache_status
+    return response
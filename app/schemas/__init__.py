@@ -32,5 +32,18 @@ from .password_reset_schema import (
 from .stocks_data_schema import (
     StocksDataSchema,
     StocksDataResponseSchema,
+    StocksPageQuerySchema,
+    StockExportQuerySchema,
+    StockSearchQuerySchema,
+    StockHistoryQuerySchema,
     StocksDataModelSchema
 )
+
+from .upload_job_schema import (
+    UploadJobResponseSchema
+)
+
+from .stock_batch_schema import (
+    StockBatchResponseSchema,
+    PurgeStockBatchesSchema
+)
@@ -0,0 +1,36 @@
+# app/schemas/stock_batch_schema.py
+# ------------------------------------------------------------
+# Marshmallow schemas for stock upload batches (snapshots)
+# ------------------------------------------------------------
+
+from marshmallow import Schema, fields, validate
+
+
+class StockBatchResponseSchema(Schema):
+    """
+    Schema for responding with a stock batch.
+
+    Fields:
+        id: UUID of the batch.
+        job_id: Upload job that produced the batch.
+        status: pending, current, superseded or purged.
+        row_count: Rows written to stocks_data for the batch.
+        created_at / activated_at / superseded_at: Lifecycle timestamps.
+    """
+    id = fields.UUID()
+    job_id = fields.UUID(allow_none=True)
+    status = fields.String()
+    row_count = fields.Integer()
+    created_at = fields.DateTime()
+    activated_at = fields.DateTime(allow_none=True)
+    superseded_at = fields.DateTime(allow_none=True)
+
+
+class PurgeStockBatchesSchema(Schema):
+    """
+    Schema for purging superseded stock batches.
+
+    Fields:
+        keep: Number of most recent superseded batches to keep for rollback.
+    """
+    keep = fields.Integer(load_default=0, validate=validate.Range(min=0))
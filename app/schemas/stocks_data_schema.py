@@ -1,4 +1,4 @@
-from marshmallow import Schema, fields
+from marshmallow import Schema, ValidationError, fields, pre_load, validate, validates_schema
 from app.extensions import ma
 from app.models.stocks_data import StocksData
 
@@ -48,6 +48,174 @@ class StocksDataResponseSchema(Schema):
     uploaded_by = fields.UUID(allow_none=True)
 
 
+# Fields of a client stock row in API responses, in output order
+STOCK_RESPONSE_FIELDS = (
+    "product", "quantity", "lot_no", "date", "packing", "weight_kgs", "bank",
+    "mark", "lorry", "chamber", "floor", "bayee", "uploaded_on",
+)
+
+# Low-cardinality fields sent as dictionary indexes in the columnar format
+DICTIONARY_FIELDS = ("product", "date", "bank", "mark", "chamber", "floor", "bayee", "uploaded_on")
+
+
+class StockFilterQuerySchema(Schema):
+    """
+    Schema for the stock filters and column selection shared by listings and exports.
+
+    Fields:
+        product / chamber / floor / lot_no: Accepted values; repeat the parameter
+            or separate values with commas to match any of them.
+        date_from / date_to: Inclusive stock date range (YYYY-MM-DD).
+        fields: Subset of STOCK_RESPONSE_FIELDS to select and return (all by default).
+    """
+    product = fields.List(fields.String(), load_default=None)
+    chamber = fields.List(fields.String(), load_default=None)
+    floor = fields.List(fields.String(), load_default=None)
+    lot_no = fields.List(fields.String(), load_default=None)
+    date_from = fields.Date(load_default=None)
+    date_to = fields.Date(load_default=None)
+
+    columns = fields.List(
+        fields.String(),
+        data_key="fields",
+        load_default=None,
+        validate=validate.ContainsOnly(STOCK_RESPONSE_FIELDS)
+    )
+
+    @pre_load
+    def split_lists(self, data, **kwargs):
+        """
+        Accepts a query string MultiDict: filter values may be repeated or comma-separated.
+        """
+        getlist = getattr(data, "getlist", None)
+        data = {key: data.get(key) for key in data}
+        for key in (*StocksData.FILTER_KEYS, "fields"):
+            if key not in data:
+                continue
+            raw = getlist(key) if getlist else data[key]
+            raw = raw if isinstance(raw, list) else [raw]
+            data[key] = [value.strip() for item in raw for value in str(item).split(",") if value.strip()]
+        return data
+
+    @validates_schema
+    def check_date_range(self, data, **kwargs):
+        if data.get("date_from") and data.get("date_to") and data["date_from"] > data["date_to"]:
+            raise ValidationError("date_from must not be after date_to.", "date_from")
+
+
+class StockKeysetQuerySchema(StockFilterQuerySchema):
+    """
+    Schema for one party's stocks read in keyset order; accepts the filters too.
+
+    Fields:
+        limit: Maximum rows returned.
+        cursor: Opaque next_cursor token from the previous page; omit to start at the first row.
+        sort: One of StocksData.SORT_KEYS, "-" prefixed for descending (default "-uploaded_on").
+    """
+    limit = fields.Integer(load_default=None, validate=validate.Range(min=1, max=1000))
+    cursor = fields.String(load_default=None)
+    sort = fields.String(
+        load_default="-uploaded_on",
+        validate=validate.OneOf([
+            prefix + key for key in StocksData.SORT_KEYS for prefix in ("", "-")
+        ])
+    )
+
+
+class StocksPageQuerySchema(StockKeysetQuerySchema):
+    """
+    Schema for the query string of paginated stock listings; accepts the filters,
+    limit (rows per page, the "stocks.page_size" config by default), cursor and sort too.
+
+    Fields:
+        include_total: Also count every matching row (costs one extra query).
+        stream: Stream every matching row (up to `limit`, if given) as one chunked JSON
+            document instead of a page; "Accept: application/x-ndjson" streams NDJSON lines.
+        format: "rows" (default, one object per stock) or "columnar" (one array per
+            column, repeated strings dictionary-encoded); paged responses only.
+    """
+    include_total = fields.Boolean(load_default=False)
+    stream = fields.Boolean(load_default=False)
+    format = fields.String(load_default="rows", validate=validate.OneOf(["rows", "columnar"]))
+
+
+class StockExportQuerySchema(StockKeysetQuerySchema):
+    """
+    Schema for the query string of a client's stock export; accepts the filters,
+    limit, cursor and sort too.
+
+    Fields:
+        format: csv (default) or xlsx.
+    """
+    format = fields.String(load_default="csv", validate=validate.OneOf(["csv", "xlsx"]))
+
+
+class AdminStockExportQuerySchema(StockFilterQuerySchema):
+    """
+    Schema for the query string of admin stock exports; accepts the filters too.
+    Rows come in party, upload time and id order, so there is no sort, cursor or limit.
+
+    Fields:
+        format: csv (default) or xlsx.
+        party_id: Party to export (every party when omitted).
+    """
+    format = fields.String(load_default="csv", validate=validate.OneOf(["csv", "xlsx"]))
+    party_id = fields.String(load_default=None)
+
+
+class StockSearchQuerySchema(Schema):
+    """
+    Schema for the query string of stock search and autocomplete.
+
+    Fields:
+        q: Text to match, case-insensitively (substring for search, prefix for autocomplete).
+        field: Match only this StocksData.SEARCH_KEYS column (all of them by default).
+        limit: Maximum rows or suggestions returned.
+        party_id: Party to search (admins only; every party when omitted).
+    """
+    q = fields.String(required=True, validate=validate.Length(min=1, max=100))
+    field = fields.String(load_default=None, validate=validate.OneOf(StocksData.SEARCH_KEYS))
+    limit = fields.Integer(load_default=20, validate=validate.Range(min=1, max=100))
+    party_id = fields.String(load_default=None)
+
+    @pre_load
+    def strip_query(self, data, **kwargs):
+        data = {key: data.get(key) for key in data}
+        if isinstance(data.get("q"), str):
+            data["q"] = data["q"].strip()
+        return data
+
+
+class StockHistoryQuerySchema(Schema):
+    """
+    Schema for the query string of stock history.
+
+    Fields:
+        product: Products to include; repeat the parameter or separate values with commas.
+        date_from / date_to: Inclusive range of upload dates (YYYY-MM-DD).
+        party_id: Party whose history to return (admins only; all parties summed when omitted).
+    """
+    product = fields.List(fields.String(), load_default=None)
+    date_from = fields.Date(load_default=None)
+    date_to = fields.Date(load_default=None)
+    party_id = fields.String(load_default=None)
+
+    @pre_load
+    def split_products(self, data, **kwargs):
+        getlist = getattr(data, "getlist", None)
+        data = {key: data.get(key) for key in data}
+        if "product" in data:
+            raw = getlist("product") if getlist else data["product"]
+            raw = raw if isinstance(raw, list) else [raw]
+            data["product"] = [value.strip() for item in raw for value in str(item).split(",") if value.strip()]
+        return data
+
+    @validates_schema
+    def check_date_range(self, data, **kwargs):
+        if data.get("date_from") and data.get("date_to") and data["date_from"] > data["date_to"]:
+            raise ValidationError("date_from must not be after date_to.", "date_from")
+
+
 class StocksDataModelSchema(ma.SQLAlchemySchema):
     """
     SQLAlchemy-based Marshmallow schema for direct use with StocksData model.
@@ -0,0 +1,37 @@
+# app/schemas/upload_job_schema.py
+# ------------------------------------------------------------
+# Marshmallow schemas for background stock upload jobs
+# ------------------------------------------------------------
+
+from marshmallow import Schema, fields
+
+
+class UploadJobResponseSchema(Schema):
+    """
+    Schema for responding with the state of a stock upload job.
+
+    Fields:
+        id: UUID of the job.
+        filename: Original name(s) of the uploaded file(s).
+        status: queued, running, completed or failed.
+        rows_parsed: Stock records parsed so far.
+        rows_inserted: Rows written to stocks_data so far.
+        rows_skipped: Records skipped because no client matched the party name.
+        error: Failure reason, if the job failed.
+        sheets: Per-sheet outcome (file, sheet, status parsed/empty/failed, rows, error).
+        duplicate_of: Earlier job with identical records, if this upload was a duplicate.
+        created_at / started_at / finished_at: Lifecycle timestamps.
+    """
+    id = fields.UUID()
+    filename = fields.String()
+    status = fields.String()
+    rows_parsed = fields.Integer()
+    rows_inserted = fields.Integer()
+    rows_skipped = fields.Integer()
+    error = fields.String(allow_none=True)
+    sheets = fields.List(fields.Dict(), allow_none=True)
+    duplicate_of = fields.UUID(allow_none=True)
+    created_by = fields.UUID(allow_none=True)
+    created_at = fields.DateTime()
+    started_at = fields.DateTime(allow_none=True)
+    finished_at = fields.DateTime(allow_none=True)
@@ -0,0 +1,86 @@
+# app/services/party_resolver.py
+# ------------------------------------------------------------
+# Matches party names from stock uploads to clients
+# ------------------------------------------------------------
+
+import re
+import string
+
+from app.config.config_loader import config_loader
+from app.config.logger_loader import app_logger
+from app.extensions import db
+from app.models.client import Client
+
+_PUNCTUATION = str.maketrans(string.punctuation, " " * len(string.punctuation))
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_party_name(name) -> str:
+    """
+    Returns the matching key of a party name: casefolded, punctuation-stripped
+    and whitespace-collapsed, so "M/s. Sri  Amirtha" and "M S SRI AMIRTHA" match.
+    """
+    if not name:
+        return ""
+    return _WHITESPACE.sub(" ", str(name).casefold().translate(_PUNCTUATION)).strip()
+
+
+class PartyResolver:
+    """
+    In-memory index of clients keyed by normalized party name.
+
+    Built with one query per ingestion; each lookup is a single dict access.
+    Aliases come from the "parties.aliases" config: {"<name in sheets>": "<party_id>"}.
+    """
+
+    def __init__(self, clients, aliases=None):
+        """
+        Args:
+            clients (iterable): (party_name, party_id) pairs.
+            aliases (dict): Alternative party name -> party_id.
+        """
+        self._index = {}
+        for party_name, party_id in clients:
+            self._add(party_name, party_id)
+
+        known_ids = set(self._index.values())
+        for alias, party_id in (aliases or {}).items():
+            if party_id not in known_ids:
+                app_logger.warning(f"Party alias '{alias}' points to unknown party_id {party_id}")
+                continue
+            self._add(alias, party_id)
+
+    def _add(self, name, party_id):
+        key = normalize_party_name(name)
+        existing = self._index.setdefault(key, party_id)
+        if existing != party_id:
+            app_logger.warning(f"Party name '{name}' is ambiguous; matching it to party_id {existing}")
+
+    def resolve(self, party_name):
+        """Returns the party_id for a party name from an upload, or None."""
+        return self._index.get(normalize_party_name(party_name))
+
+    def __contains__(self, party_name):
+        return self.resolve(party_name) is not None
+
+
+def load_party_resolver() -> PartyResolver:
+    """
+    Builds a resolver from every client, loaded in a single query, plus the configured aliases.
+    """
+    aliases = config_loader.config.get("parties", {}).get("aliases", {})
+    return PartyResolver(db.session.query(Client.party_name, Client.party_id), aliases)
+
+
+def find_conflicting_party(party_name, party_id=None):
+    """
+    Returns the party_id of another client (or alias) that `party_name` would resolve to.
+
+    create_client and update_client reject such names, so the resolver stays unambiguous.
+
+    Args:
+        party_name (str): New party name.
+        party_id (str): The client being renamed, which never conflicts with itself.
+    """
+    resolved = load_party_resolver().resolve(party_name)
+    return resolved if resolved and resolved != party_id else None
@@ -0,0 +1,115 @@
+# app/services/password_hasher.py
+# ------------------------------------------------------------
+# Password hashing off the request worker, with configurable cost
+# ------------------------------------------------------------
+
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+from app.config.config_loader import config_loader
+
+try:
+    import gevent
+    from gevent import monkey
+    from gevent.threadpool import ThreadPool as GeventThreadPool
+except ImportError:  # gevent is only present when served by a gevent worker
+    gevent = None
+
+_executor = None
+_executor_lock = threading.Lock()
+_method_prefix = None
+
+
+def _passwords_config() -> dict:
+    return config_loader.config.get("passwords", {})
+
+
+def _hash_settings():
+    cfg = _passwords_config()
+    return cfg.get("method", "scrypt:32768:8:1"), cfg.get("salt_length", 16)
+
+
+def get_executor():
+    """
+    Returns the pool password hashes run on, created from the "passwords" config on first use.
+
+    "executor": "thread" (default) uses OS threads; hashlib's scrypt and pbkdf2
+    release the GIL, so hashes run in parallel while requests keep being served.
+    "process" uses a process pool instead.
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                cfg = _passwords_config()
+                max_workers = cfg.get("max_workers", 4)
+                if cfg.get("executor", "thread") == "process":
+                    _executor = ProcessPoolExecutor(max_workers=max_workers)
+                elif _gevent_patched():
+                    # Patched threads are greenlets; a gevent pool runs real OS threads. It is
+                    # our own, so DNS lookups on the hub's shared pool never queue behind hashes.
+                    _executor = GeventThreadPool(max_workers)
+                else:
+                    _executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="password-hash")
+    return _executor
+
+
+def reset_executor():
+    """Shuts the pool down so the next hash recreates it from the current "passwords" config."""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if isinstance(executor, (ThreadPoolExecutor, ProcessPoolExecutor)):
+        executor.shutdown(wait=True)
+    elif executor is not None:
+        executor.kill()  # gevent ThreadPool
+
+
+def _gevent_patched() -> bool:
+    return gevent is not None and monkey.is_module_patched("threading")
+
+
+def _run(fn, *args):
+    """Runs a hash function on the pool and waits for it without blocking other requests."""
+    executor = get_executor()
+    if isinstance(executor, (ThreadPoolExecutor, ProcessPoolExecutor)):
+        return executor.submit(fn, *args).result()
+    return executor.apply(fn, args)  # gevent ThreadPool
+
+
+def hash_password(password: str) -> str:
+    """Hashes a password with the configured method and salt length."""
+    method, salt_length = _hash_settings()
+    return _run(generate_password_hash, password, method, salt_length)
+
+
+def verify_password(pwhash: str, password: str) -> bool:
+    """Checks a password against a stored hash of any supported method."""
+    return _run(check_password_hash, pwhash, password)
+
+
+def needs_rehash(pwhash: str) -> bool:
+    """
+    True when a stored hash was made with other parameters than the configured ones
+    (method, cost or salt length), so it should be replaced on the next login.
+    """
+    method, salt_length = _hash_settings()
+    try:
+        prefix, salt, _ = pwhash.split("$", 2)
+    except ValueError:
+        return True
+    return prefix != _configured_prefix(method, salt_length) or len(salt) != salt_length
+
+
+def _configured_prefix(method, salt_length):
+    """
+    The "method:params" prefix Werkzeug writes for the configured method, with
+    defaults filled in (e.g. "scrypt" -> "scrypt:32768:8:1"). Computed once.
+    """
+    global _method_prefix
+    if _method_prefix is None or _method_prefix[0] != method:
+        sample = _run(generate_password_hash, "", method, salt_length)
+        _method_prefix = (method, sample.split("$", 1)[0])
+    return _method_prefix[1]
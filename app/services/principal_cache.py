@@ -0,0 +1,148 @@
+# app/services/principal_cache.py
+# ------------------------------------------------------------
+# Authenticated principals (user + admin/client identity), cached per process
+# ------------------------------------------------------------
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from sqlalchemy.orm import joinedload
+
+from app.config.config_loader import config_loader
+from app.models.user import User
+from app.schemas.admin_schema import AdminResponseSchema
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+class Principal:
+    """
+    Identity of the caller: the user row plus its admin or client profile, detached from the session.
+
+    Attributes:
+        user_id (UUID), email, role ("admin" | "client"), is_active,
+        admin_id / admin_name (admins), party_id / party_name (clients),
+        profile (dict): AdminResponseSchema dump for admins, None for clients.
+    """
+
+    def __init__(self, user_id, email, role, is_active, admin_id=None, admin_name=None,
+                 party_id=None, party_name=None, profile=None):
+        self.user_id = user_id
+        self.email = email
+        self.role = role
+        self.is_active = is_active
+        self.admin_id = admin_id
+        self.admin_name = admin_name
+        self.party_id = party_id
+        self.party_name = party_name
+        self.profile = profile
+
+    @classmethod
+    def from_user(cls, user):
+        admin, client = user.admin, user.client
+        return cls(
+            user_id=user.id,
+            email=user.email,
+            role=user.role,
+            is_active=bool(user.is_active),
+            admin_id=admin.admin_id if admin else None,
+            admin_name=admin.admin_name if admin else None,
+            party_id=client.party_id if client else None,
+            party_name=client.party_name if client else None,
+            profile=AdminResponseSchema().dump(admin) if admin else None
+        )
+
+
+class PrincipalCache:
+    """
+    LRU cache of principals by user id with a short TTL.
+
+    Routes that change a user's email, status or profile invalidate that user;
+    other processes see the change once their entry expires.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # user_id (str) -> (expires_at, Principal)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or entry[0] < time.monotonic():
+                self._entries.pop(user_id, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, user_id, principal):
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + self.ttl_seconds, principal)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(str(user_id), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def get_principal_cache() -> PrincipalCache:
+    """Returns the process-wide principal cache, created from the "auth" config on first use."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                auth_cfg = config_loader.config.get("auth", {})
+                _cache = PrincipalCache(
+                    ttl_seconds=auth_cfg.get("principal_ttl_seconds", 30),
+                    max_entries=auth_cfg.get("principal_cache_size", 10000)
+                )
+    return _cache
+
+
+def load_principal(user_id):
+    """
+    Returns the Principal of a JWT identity, or None when the user does not exist.
+
+    Served from the cache when warm; otherwise the user and its admin/client
+    profile are loaded in one joined query.
+    """
+    user_id = str(user_id)
+    cache = get_principal_cache()
+    principal = cache.get(user_id)
+    if principal is not None:
+        return principal
+
+    try:
+        key = uuid.UUID(user_id)
+    except ValueError:
+        return None
+    user = (
+        User.query.options(joinedload(User.admin), joinedload(User.client))
+        .filter(User.id == key)
+        .first()
+    )
+    if user is None:
+        return None
+
+    principal = Principal.from_user(user)
+    cache.set(user_id, principal)
+    return principal
+
+
+def invalidate_principal(user_id):
+    """Drops a user's cached principal after their email, status or profile changed."""
+    get_principal_cache().invalidate(user_id)
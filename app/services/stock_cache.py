@@ -0,0 +1,128 @@
+# app/services/stock_cache.py
+# ------------------------------------------------------------
+# In-process cache of serialized client stock responses
+# ------------------------------------------------------------
+
+import threading
+import time
+from collections import OrderedDict
+
+from app.config.config_loader import config_loader
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+class StockResponseCache:
+    """
+    LRU cache of serialized stock responses with a TTL, bounded by total body size.
+
+    Entries are keyed by (party_id, variant), where the variant identifies the
+    current batch and the request's query string, and are indexed by party so
+    one party's entries can be dropped without touching anyone else's.
+    """
+
+    def __init__(self, max_bytes: int, ttl_seconds: float):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()   # (party_id, variant) -> (expires_at, body)
+        self._party_keys = {}           # party_id -> set of keys
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, party_id, variant):
+        """Returns the cached body, or None (counted as a miss)."""
+        key = (party_id, variant)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] < time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, party_id, variant, body: bytes):
+        """Stores a body, evicting least recently used entries beyond max_bytes."""
+        if len(body) > self.max_bytes:
+            return
+        key = (party_id, variant)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, body)
+            self._party_keys.setdefault(party_id, set()).add(key)
+            self._bytes += len(body)
+            while self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate_parties(self, party_ids):
+        """Drops every entry of the given parties."""
+        with self._lock:
+            for party_id in party_ids:
+                for key in self._party_keys.get(party_id, set()).copy():
+                    self._remove(key)
+                    self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+            self._party_keys.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "parties": len(self._party_keys),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations
+            }
+
+    def _remove(self, key):
+        _, body = self._entries.pop(key)
+        self._bytes -= len(body)
+        party_keys = self._party_keys.get(key[0])
+        if party_keys is not None:
+            party_keys.discard(key)
+            if not party_keys:
+                del self._party_keys[key[0]]
+
+
+def get_stock_cache() -> StockResponseCache:
+    """
+    Returns the process-wide stock response cache, created from the "stocks" config on first use.
+
+    Each process has its own cache. Cached variants include the current batch id,
+    so a snapshot swap made by another process is never served stale; invalidation
+    only frees the superseded entries early.
+    """
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                stocks_cfg = config_loader.config.get("stocks", {})
+                _cache = StockResponseCache(
+                    max_bytes=stocks_cfg.get("cache_max_mb", 64) * 1024 * 1024,
+                    ttl_seconds=stocks_cfg.get("cache_ttl_seconds", 300)
+                )
+    return _cache
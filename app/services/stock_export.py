@@ -0,0 +1,119 @@
+# app/services/stock_export.py
+# ------------------------------------------------------------
+# Streaming CSV / XLSX export of stock rows
+# ------------------------------------------------------------
+
+import csv
+import io
+import os
+import tempfile
+from datetime import date
+
+from flask import current_app, stream_with_context
+from openpyxl import Workbook
+from werkzeug.utils import secure_filename
+
+from app.config.config_loader import config_loader
+
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+# Column headers of exported files, by StocksData attribute
+EXPORT_HEADERS = {
+    "party_id": "PARTY ID",
+    "party_name": "PARTY NAME",
+    "product": "PRODUCT",
+    "quantity": "QTY",
+    "lot_no": "LOT NO",
+    "date": "DATE",
+    "packing": "PACKING",
+    "weight_kgs": "WEIGHT KGS",
+    "bank": "BANK",
+    "mark": "MARK",
+    "lorry": "LORRY",
+    "chamber": "CHAMBER",
+    "floor": "FLOOR",
+    "bayee": "BAYEE",
+    "uploaded_on": "UPLOADED ON",
+}
+
+
+def export_response(stocks, columns, export_format, basename):
+    """
+    Builds a streamed attachment response for `stocks` in the requested format.
+
+    Args:
+        basename (str): Download file name without date or extension.
+    """
+    filename = f"{secure_filename(basename) or 'stocks'}_{date.today():%Y%m%d}.{export_format}"
+    rows_per_chunk = config_loader.config.get("stocks", {}).get("stream_batch_size", 1000)
+    response = current_app.response_class(
+        stream_with_context(stream_export(stocks, columns, export_format, rows_per_chunk)),
+        status=200,
+        mimetype=EXPORT_FORMATS[export_format]
+    )
+    response.headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
+def stream_export(stocks, columns, export_format, rows_per_chunk=1000):
+    """
+    Yields the bytes of an export file for `stocks`, read lazily.
+
+    Args:
+        stocks (iterable): StocksData rows, typically from a server-side cursor.
+        columns (list[str]): StocksData attributes to export, in order.
+        export_format (str): "csv" or "xlsx".
+        rows_per_chunk (int): CSV rows encoded per yielded chunk.
+    """
+    if export_format == "xlsx":
+        return _stream_xlsx(stocks, columns)
+    return _stream_csv(stocks, columns, rows_per_chunk)
+
+
+def _stream_csv(stocks, columns, rows_per_chunk):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    # UTF-8 BOM so Excel opens non-ASCII party names correctly
+    buffer.write("\ufeff")
+    writer.writerow([EXPORT_HEADERS[name] for name in columns])
+    pending = 0
+    for stock in stocks:
+        writer.writerow(["" if value is None else value for value in (getattr(stock, name) for name in columns)])
+        pending += 1
+        if pending == rows_per_chunk:
+            yield _drain(buffer)
+            pending = 0
+    yield _drain(buffer)
+
+
+def _drain(buffer) -> bytes:
+    data = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    return data.encode("utf-8")
+
+
+def _stream_xlsx(stocks, columns, block_size=1024 * 1024):
+    """
+    Writes rows with openpyxl's write-only mode, which spools them to disk, then
+    streams the finished file. XLSX is a ZIP archive, so bytes can only be sent
+    once the workbook is complete; memory stays constant either way.
+    """
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Stock")
+    sheet.append([EXPORT_HEADERS[name] for name in columns])
+    for stock in stocks:
+        sheet.append([getattr(stock, name) for name in columns])
+
+    fd, path = tempfile.mkstemp(prefix="stock-export-", suffix=".xlsx")
+    os.close(fd)
+    try:
+        workbook.save(path)
+        with open(path, "rb") as f:
+            while block := f.read(block_size):
+                yield block
+    finally:
+        os.remove(path)
@@ -0,0 +1,214 @@
+# app/services/stock_search.py
+# ------------------------------------------------------------
+# Search and autocomplete over the current stock snapshot
+# ------------------------------------------------------------
+
+import threading
+from bisect import bisect_left
+
+from app.extensions import db
+from app.models.stocks_data import StocksData
+from app.services.stock_service import current_batch_id
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def search_stocks(q, party_id=None, field=None, limit=20) -> list:
+    """
+    Returns current-batch stock rows whose searchable fields contain `q` (case-insensitive).
+
+    Args:
+        q (str): Text to look for.
+        party_id (str): Restrict to one party (clients); every party when None (admins).
+        field (str): Search only this StocksData.SEARCH_KEYS column.
+        limit (int): Maximum rows returned.
+    """
+    fields = [field] if field else list(StocksData.SEARCH_KEYS)
+    if _uses_trigram_indexes():
+        pattern = f"%{_escape_like(q)}%"
+        query = _scoped_query(party_id).filter(
+            db.or_(*(getattr(StocksData, name).ilike(pattern, escape="\\") for name in fields))
+        )
+        return query.order_by(StocksData.party_id, StocksData.lot_no, StocksData.id).limit(limit).all()
+
+    ids = get_search_index().search(q, party_id, fields, limit)
+    if not ids:
+        return []
+    stocks = {stock.id: stock for stock in StocksData.query.filter(StocksData.id.in_(ids))}
+    return [stocks[row_id] for row_id in ids if row_id in stocks]
+
+
+def autocomplete(q, party_id=None, field=None, limit=10) -> list[dict]:
+    """
+    Suggests distinct field values starting with `q` (case-insensitive), most frequent first.
+
+    Returns:
+        list[dict]: {"field", "value", "count"} where count is the number of matching rows.
+    """
+    fields = [field] if field else list(StocksData.SEARCH_KEYS)
+    if not _uses_trigram_indexes():
+        return get_search_index().autocomplete(q, party_id, fields, limit)
+
+    pattern = f"{_escape_like(q)}%"
+    suggestions = []
+    for name in fields:
+        column = getattr(StocksData, name)
+        rows = (
+            _scoped_query(party_id)
+            .with_entities(column, db.func.count())
+            .filter(column.ilike(pattern, escape="\\"))
+            .group_by(column)
+            .order_by(db.func.count().desc(), column)
+            .limit(limit)
+        )
+        suggestions.extend({"field": name, "value": value, "count": count} for value, count in rows)
+    suggestions.sort(key=lambda suggestion: -suggestion["count"])
+    return suggestions[:limit]
+
+
+def get_search_index():
+    """
+    Returns the in-memory index of the current batch, building it on first use.
+
+    The index is keyed by batch id, so it is rebuilt after every upload even when
+    the upload ran in another process.
+    """
+    global _index
+    batch_id = current_batch_id()
+    index = _index
+    if index is None or index.batch_id != batch_id:
+        with _index_lock:
+            if _index is None or _index.batch_id != batch_id:
+                _index = StockSearchIndex.build(batch_id)
+            index = _index
+    return index
+
+
+def invalidate_search_index():
+    """Drops the in-memory index; the next search rebuilds it."""
+    global _index
+    _index = None
+
+
+class StockSearchIndex:
+    """
+    Inverted index of the distinct searchable values of one batch, for databases
+    without trigram indexes.
+
+    Distinct values are kept sorted for prefix lookups (bisect) and indexed by
+    trigram for substring lookups; each value maps to its rows, grouped by party.
+    """
+
+    def __init__(self, batch_id):
+        self.batch_id = batch_id
+        self._values = []     # (field, value)
+        self._lowered = []    # casefolded value, parallel to _values
+        self._postings = []   # party_id -> [row id], parallel to _values
+        self._sorted = []     # (casefolded value, value index), sorted
+        self._trigrams = {}   # trigram -> {value index}
+
+    @classmethod
+    def build(cls, batch_id, batch_size=5000):
+        """Loads every searchable value of the batch in one streamed query."""
+        index = cls(batch_id)
+        positions = {}
+        columns = [getattr(StocksData, name) for name in StocksData.SEARCH_KEYS]
+        query = (
+            db.session.query(StocksData.id, StocksData.party_id, *columns)
+            .filter(StocksData.batch_id.is_(None) if batch_id is None else StocksData.batch_id == batch_id)
+            .yield_per(batch_size)
+        )
+        for row_id, party_id, *values in query:
+            for name, value in zip(StocksData.SEARCH_KEYS, values):
+                if not value:
+                    continue
+                position = positions.get((name, value))
+                if position is None:
+                    position = positions[(name, value)] = index._add_value(name, value)
+                index._postings[position].setdefault(party_id, []).append(row_id)
+        index._sorted.sort()
+        return index
+
+    def _add_value(self, name, value):
+        position = len(self._values)
+        lowered = value.casefold()
+        self._values.append((name, value))
+        self._lowered.append(lowered)
+        self._postings.append({})
+        self._sorted.append((lowered, position))
+        for trigram in _trigrams(lowered):
+            self._trigrams.setdefault(trigram, set()).add(position)
+        return position
+
+    def _prefix_matches(self, q):
+        start = bisect_left(self._sorted, (q,))
+        for lowered, position in self._sorted[start:]:
+            if not lowered.startswith(q):
+                break
+            yield position
+
+    def _substring_matches(self, q):
+        grams = _trigrams(q)
+        if grams:
+            candidates = set.intersection(*(self._trigrams.get(gram, set()) for gram in grams))
+        else:
+            candidates = range(len(self._values))  # fewer than 3 characters: scan distinct values
+        matches = [position for position in candidates if q in self._lowered[position]]
+        return sorted(matches, key=lambda position: (self._lowered[position], position))
+
+    def _rows(self, position, party_id):
+        postings = self._postings[position]
+        if party_id is not None:
+            return postings.get(party_id, [])
+        return [row_id for rows in postings.values() for row_id in rows]
+
+    def search(self, q, party_id, fields, limit) -> list:
+        """Row ids whose fields contain `q`; prefix matches are listed first."""
+        q = q.casefold()
+        prefix = list(self._prefix_matches(q))
+        seen = set(prefix)
+        ordered = prefix + [position for position in self._substring_matches(q) if position not in seen]
+
+        ids, found = [], set()
+        for position in ordered:
+            if self._values[position][0] not in fields:
+                continue
+            for row_id in self._rows(position, party_id):
+                if row_id not in found:
+                    found.add(row_id)
+                    ids.append(row_id)
+                    if len(ids) == limit:
+                        return ids
+        return ids
+
+    def autocomplete(self, q, party_id, fields, limit) -> list[dict]:
+        suggestions = []
+        for position in self._prefix_matches(q.casefold()):
+            name, value = self._values[position]
+            if name not in fields:
+                continue
+            count = len(self._rows(position, party_id))
+            if count:
+                suggestions.append({"field": name, "value": value, "count": count})
+        suggestions.sort(key=lambda suggestion: (-suggestion["count"], suggestion["value"]))
+        return suggestions[:limit]
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _scoped_query(party_id):
+    query = StocksData.query.filter_by(batch_id=current_batch_id())
+    if party_id is not None:
+        query = query.filter_by(party_id=party_id)
+    return query
+
+
+def _uses_trigram_indexes():
+    return db.session.connection().dialect.name == "postgresql"
+
+
+def _escape_like(text):
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
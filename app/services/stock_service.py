@@ -0,0 +1,807 @@
+# app/services/stock_service.py
+# ------------------------------------------------------------
+# Bulk persistence of parsed stock records into stocks_data
+# ------------------------------------------------------------
+
+import io
+import os
+import tempfile
+import uuid
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import date, datetime, timedelta
+from itertools import chain, islice, repeat
+
+import pandas as pd
+from sqlalchemy.orm import load_only
+
+from app.config.config_loader import config_loader
+from app.extensions import db
+from app.models.stock_batch import StockBatch
+from app.models.stock_history import StockHistory
+from app.models.stock_summary import StockSummary
+from app.models.stocks_data import StocksData
+from app.models.upload_job import UploadJob
+from app.services.party_resolver import load_party_resolver
+from app.utils.helpers import EmptySheetError, StockParseError, StockParser, helpers
+
+# stocks_data columns written by bulk inserts, in COPY order
+STOCK_COLUMNS = [
+    "id", "party_id", "party_name", "bank", "lot_no", "date", "mark", "lorry",
+    "product", "packing", "quantity", "weight_kgs", "chamber", "floor", "bayee",
+    "uploaded_on", "uploaded_by", "batch_id",
+]
+
+# Advisory lock key guarding the current-batch swap on PostgreSQL
+BATCH_SWAP_LOCK = 740_051
+
+# Every StockParser record key, in a fixed order
+RECORD_KEYS = [
+    "party_name", "s_no", "bank", "lot_no", "date", "mark", "lorry", "product",
+    "packing", "quantity", "weight_kgs", "chamber", "floor", "bayee",
+]
+
+# Record keys copied as-is from StockParser output
+RECORD_FIELDS = [
+    "bank", "lot_no", "mark", "lorry", "product", "packing",
+    "quantity", "weight_kgs", "chamber", "floor", "bayee",
+]
+
+
+class StockSheetsError(StockParseError):
+    """Raised when sheets of an upload fail to parse; `sheets` holds the per-sheet report."""
+
+    def __init__(self, message, sheets):
+        super().__init__(message)
+        self.sheets = sheets
+
+
+def ingest_stock_files(
+    sources, uploaded_by, on_progress=None, records_digest=None, job_id=None, find_duplicate=None
+) -> dict:
+    """
+    Parses every sheet of the uploaded Excel, CSV or Parquet files (ZIP archives are
+    unpacked) into a new pending batch inside the current session transaction.
+
+    Every sheet is parsed before anything is written: each one is spooled chunk by chunk
+    to a temporary file, so memory stays bounded by the chunk size, not the sheet size.
+    With several sheets, they are parsed in parallel in a process pool ("stocks.parse_workers",
+    all cores by default), with at most one sheet per worker in flight. The spools are then
+    loaded in upload order. A failed sheet or a duplicate upload therefore costs no inserts.
+
+    The caller activates the batch (see activate_batch()) and commits, or rolls back.
+
+    Args:
+        sources (list[tuple[str, str]]): (display name, path) of each uploaded file.
+        uploaded_by (str | UUID): Id of the uploading user.
+        on_progress (callable): Optional callback receiving the running counts after each chunk.
+        records_digest: Optional hashlib object fed with every normalized record.
+        job_id (UUID): Upload job the batch belongs to.
+        find_duplicate (callable): Optional; given the records digest (hex) once every sheet
+            is parsed, returns the earlier upload with the same records, or None. When it
+            returns one, nothing is inserted and no batch is created.
+
+    Returns:
+        dict: rows_parsed, rows_inserted, rows_skipped, the new batch_id (None for a
+            duplicate), duplicate_of (what find_duplicate returned, or None) and `sheets`,
+            a report entry per sheet (file, sheet, status, rows, error).
+
+    Raises:
+        StockSheetsError: If any file or sheet fails to parse (empty sheets do not count).
+        EmptySheetError: If no sheet holds any stock record.
+    """
+    stocks_cfg = config_loader.config.get("stocks", {})
+    chunk_size = stocks_cfg.get("chunk_size", 5000)
+    parse_workers = stocks_cfg.get("parse_workers") or os.cpu_count() or 1
+    counts = {"rows_parsed": 0, "rows_inserted": 0, "rows_skipped": 0}
+
+    with tempfile.TemporaryDirectory(prefix="stock-upload-") as extract_dir:
+        sheets, report = _list_upload_sheets(StockParser.expand_sources(sources, extract_dir))
+        spools = []
+
+        def collect(name, sheet, spool_path, result):
+            rows, error = result.result() if isinstance(result, Future) else result
+            report.append(_sheet_report(name, sheet, 0 if error else rows, error))
+            if error is None:
+                spools.append(spool_path)
+                counts["rows_parsed"] += rows
+                if on_progress:
+                    on_progress(dict(counts))
+
+        spool_paths = [os.path.join(extract_dir, f"sheet-{index:04d}.spool") for index in range(len(sheets))]
+        if parse_workers > 1 and len(sheets) > 1:
+            window = min(parse_workers, len(sheets))
+            with ProcessPoolExecutor(max_workers=window) as pool:
+                # At most `window` sheets are in flight; results are collected in upload order
+                pending = deque()
+                for (name, path, sheet), spool_path in zip(sheets, spool_paths):
+                    if len(pending) == window:
+                        collect(*pending.popleft())
+                    future = pool.submit(StockParser.spool_sheet, path, spool_path, sheet, chunk_size)
+                    pending.append((name, sheet, spool_path, future))
+                while pending:
+                    collect(*pending.popleft())
+        else:
+            for (name, path, sheet), spool_path in zip(sheets, spool_paths):
+                collect(name, sheet, spool_path, StockParser.spool_sheet(path, spool_path, sheet, chunk_size))
+
+        failed = [entry for entry in report if entry["status"] == "failed"]
+        if failed:
+            details = "; ".join(
+                f"{entry['file']}" + (f" / {entry['sheet']}" if entry["sheet"] else "") + f": {entry['error']}"
+                for entry in failed
+            )
+            raise StockSheetsError(f"❌ {len(failed)} of {len(report)} sheet(s) failed to parse: {details}", report)
+        if not counts["rows_parsed"]:
+            raise EmptySheetError("❌ No valid stock records found in the file.")
+
+        if records_digest is not None:
+            for spool_path in spools:
+                for chunk in StockParser.iter_spooled_chunks(spool_path):
+                    update_records_digest(records_digest, chunk)
+            duplicate = find_duplicate(records_digest.hexdigest()) if find_duplicate else None
+            if duplicate is not None:
+                return {**counts, "batch_id": None, "duplicate_of": duplicate, "sheets": report}
+
+        # Index every party once, then load each sheet's records chunk by chunk.
+        parties = load_party_resolver()
+        batch = create_batch(job_id)
+        uploaded_on = datetime.utcnow()
+        for spool_path in spools:
+            for chunk in StockParser.iter_spooled_chunks(spool_path):
+                rows, skipped = build_stock_rows(chunk, parties, uploaded_by, uploaded_on, batch.id)
+                counts["rows_inserted"] += bulk_insert_stocks(rows)
+                counts["rows_skipped"] += skipped
+                if on_progress:
+                    on_progress(dict(counts))
+            os.remove(spool_path)
+
+    return {**counts, "batch_id": batch.id, "duplicate_of": None, "sheets": report}
+
+
+def validate_stock_files(sources) -> dict:
+    """
+    Dry run: parses every sheet of the uploaded files in one pass, writing nothing.
+
+    Unlike ingestion, invalid rows do not stop the parse; each one is reported.
+    Sheets are parsed in the same process pool as ingest_stock_files().
+
+    Args:
+        sources (list[tuple[str, str]]): (display name, path) of each uploaded file.
+
+    Returns:
+        dict: A report with
+            valid: True when nothing is wrong and every party matches a client.
+            totals: rows_valid, rows_invalid, rows_matched, rows_unmatched, sheets, sheets_failed.
+            invalid_rows: Every invalid row ({"file", "sheet", "row", "error"}).
+            unmatched_parties: Party names with no client ({"party_name", "rows"}).
+            parties: Valid rows per party ({"party_name", "rows", "matched"}).
+            sheets: The per-sheet report, as for ingestion.
+    """
+    stocks_cfg = config_loader.config.get("stocks", {})
+    chunk_size = stocks_cfg.get("chunk_size", 5000)
+    parse_workers = stocks_cfg.get("parse_workers") or os.cpu_count() or 1
+
+    resolver = load_party_resolver()
+    party_rows, invalid_rows = {}, []
+
+    with tempfile.TemporaryDirectory(prefix="stock-validate-") as extract_dir:
+        sheets, report = _list_upload_sheets(StockParser.expand_sources(sources, extract_dir))
+        args = ([path for _, path, _ in sheets], [sheet for _, _, sheet in sheets], repeat(chunk_size))
+
+        if parse_workers > 1 and len(sheets) > 1:
+            with ProcessPoolExecutor(max_workers=min(parse_workers, len(sheets))) as pool:
+                results = list(pool.map(StockParser.validate_sheet, *args))
+        else:
+            results = list(map(StockParser.validate_sheet, *args))
+
+    for (name, _, sheet), (sheet_parties, errors, error) in zip(sheets, results):
+        for party_name, rows in sheet_parties.items():
+            party_rows[party_name] = party_rows.get(party_name, 0) + rows
+        invalid_rows.extend({"file": name, "sheet": sheet, **row_error} for row_error in errors)
+        report.append(_sheet_report(name, sheet, sum(sheet_parties.values()), error))
+
+    parties = [
+        {"party_name": party_name, "rows": rows, "matched": party_name in resolver}
+        for party_name, rows in sorted(party_rows.items())
+    ]
+    unmatched = [{"party_name": p["party_name"], "rows": p["rows"]} for p in parties if not p["matched"]]
+    sheets_failed = sum(entry["status"] == "failed" for entry in report)
+    rows_valid = sum(party_rows.values())
+    rows_unmatched = sum(p["rows"] for p in unmatched)
+
+    return {
+        "valid": not invalid_rows and not unmatched and not sheets_failed and rows_valid > 0,
+        "totals": {
+            "rows_valid": rows_valid,
+            "rows_invalid": len(invalid_rows),
+            "rows_matched": rows_valid - rows_unmatched,
+            "rows_unmatched": rows_unmatched,
+            "sheets": len(report),
+            "sheets_failed": sheets_failed
+        },
+        "invalid_rows": invalid_rows,
+        "unmatched_parties": unmatched,
+        "parties": parties,
+        "sheets": report
+    }
+
+
+def _list_upload_sheets(workbooks):
+    """
+    Lists (file, path, sheet) for every sheet of every workbook.
+
+    Workbooks that cannot be opened get a failed entry in the returned report instead.
+    """
+    sheets, report = [], []
+    for name, path in workbooks:
+        try:
+            sheets.extend((name, path, sheet) for sheet in StockParser.list_sheets(path))
+        except StockParseError as e:
+            report.append(_sheet_report(name, None, 0, e))
+    return sheets, report
+
+
+def _sheet_report(name, sheet, rows, error) -> dict:
+    if error is None:
+        status = "parsed"
+    elif isinstance(error, EmptySheetError):
+        status = "empty"
+    else:
+        status = "failed"
+    return {
+        "file": name,
+        "sheet": sheet,
+        "status": status,
+        "rows": rows,
+        "error": str(error).removeprefix("❌ ") if status == "failed" else None
+    }
+
+
+def create_batch(job_id=None) -> StockBatch:
+    """
+    Adds a pending batch to the session; its rows stay hidden until it is activated.
+    """
+    batch = StockBatch(job_id=job_id, status=StockBatch.STATUS_PENDING)
+    db.session.add(batch)
+    db.session.flush()
+    return batch
+
+
+def activate_batch(batch_id, row_count):
+    """
+    Makes `batch_id` the current snapshot and supersedes the previous one.
+
+    Runs in the caller's transaction, so readers switch from the old snapshot to
+    the new one at commit, never seeing a partial upload.
+
+    Returns:
+        set | None: party_ids whose visible stocks change (rows in the old or the
+            new snapshot), or None when the previous rows predate batches.
+    """
+    table = StockBatch.__table__
+    now = datetime.utcnow()
+
+    if db.session.connection().dialect.name == "postgresql":
+        # Serialize concurrent swaps so each one sees the latest current batch
+        db.session.execute(db.text("SELECT pg_advisory_xact_lock(:key)"), {"key": BATCH_SWAP_LOCK})
+
+    build_batch_summaries(batch_id)
+    build_batch_history(batch_id, now)
+
+    previous_id = current_batch_id()
+    affected = None
+    if previous_id is not None:
+        affected = {
+            party_id for (party_id,) in db.session.query(StocksData.party_id)
+            .filter(StocksData.batch_id.in_([previous_id, batch_id]))
+            .distinct()
+        }
+
+    db.session.execute(
+        table.update()
+        .where(table.c.status == StockBatch.STATUS_CURRENT, table.c.id != batch_id)
+        .values(status=StockBatch.STATUS_SUPERSEDED, superseded_at=now)
+    )
+    db.session.execute(
+        table.update()
+        .where(table.c.id == batch_id)
+        .values(status=StockBatch.STATUS_CURRENT, activated_at=now, row_count=row_count)
+    )
+    return affected
+
+
+def build_batch_summaries(batch_id):
+    """
+    Stores the batch's per-party totals by product, chamber and bank in stock_summaries.
+
+    One INSERT ... SELECT ... GROUP BY per dimension, run by the database inside the
+    upload transaction, so client summaries never scan stocks_data.
+    """
+    table = StockSummary.__table__
+    for dimension in StockSummary.DIMENSIONS:
+        totals = _summary_totals(dimension, StocksData.batch_id == batch_id)
+        db.session.execute(
+            table.insert().from_select(
+                ["batch_id", "party_id", "dimension", "value", "rows", "quantity", "weight_kgs"],
+                db.select(
+                    db.literal(batch_id, db.Uuid),
+                    totals.c.party_id,
+                    db.literal(dimension, db.String),
+                    totals.c.value,
+                    totals.c.rows,
+                    totals.c.quantity,
+                    totals.c.weight_kgs
+                )
+            )
+        )
+
+
+def build_batch_history(batch_id, recorded_on):
+    """
+    Appends the batch's per-party product totals to stock_history, stamped with `recorded_on`.
+
+    Copies the product rows just written to stock_summaries, so history costs one
+    small INSERT ... SELECT per upload instead of another pass over stocks_data.
+    """
+    summaries = StockSummary.__table__
+    db.session.execute(
+        StockHistory.__table__.insert().from_select(
+            ["batch_id", "party_id", "product", "recorded_on", "rows", "quantity", "weight_kgs"],
+            db.select(
+                summaries.c.batch_id,
+                summaries.c.party_id,
+                summaries.c.value,
+                db.literal(recorded_on, db.DateTime),
+                summaries.c.rows,
+                summaries.c.quantity,
+                summaries.c.weight_kgs
+            ).where(summaries.c.batch_id == batch_id, summaries.c.dimension == "product")
+        )
+    )
+
+
+def stock_history(party_id=None, products=None, date_from=None, date_to=None) -> dict:
+    """
+    Returns quantity and weight per product at every upload, from the stock_history rollups.
+
+    Args:
+        party_id (str): One party's holdings; every party's, summed, when None.
+        products (list[str]): Only these products.
+        date_from / date_to (date): Inclusive range of upload dates.
+
+    Returns:
+        dict: "uploads" (activation timestamps, oldest first) and "series", one per
+            product, with "quantity" and "weight_kgs" lists aligned to "uploads".
+            A product absent from an upload holds 0 there.
+    """
+    batches = db.session.query(StockBatch.id, StockBatch.activated_at).filter(StockBatch.activated_at.isnot(None))
+    history = db.session.query(
+        StockHistory.batch_id,
+        StockHistory.product,
+        db.func.sum(StockHistory.quantity),
+        db.func.sum(StockHistory.weight_kgs)
+    )
+    if date_from:
+        batches = batches.filter(StockBatch.activated_at >= date_from)
+        history = history.filter(StockHistory.recorded_on >= date_from)
+    if date_to:
+        batches = batches.filter(StockBatch.activated_at < date_to + timedelta(days=1))
+        history = history.filter(StockHistory.recorded_on < date_to + timedelta(days=1))
+    if party_id is not None:
+        history = history.filter(StockHistory.party_id == party_id)
+    if products:
+        history = history.filter(StockHistory.product.in_(products))
+
+    uploads = batches.order_by(StockBatch.activated_at, StockBatch.id).all()
+    positions = {batch_id: position for position, (batch_id, _) in enumerate(uploads)}
+
+    series = {}
+    for batch_id, product, quantity, weight_kgs in history.group_by(StockHistory.batch_id, StockHistory.product):
+        position = positions.get(batch_id)
+        if position is None:
+            continue
+        points = series.setdefault(product, {
+            "product": product,
+            "quantity": [0] * len(uploads),
+            "weight_kgs": [0.0] * len(uploads)
+        })
+        points["quantity"][position] = int(quantity)
+        points["weight_kgs"][position] = float(weight_kgs)
+
+    return {
+        "uploads": [activated_at.isoformat() for _, activated_at in uploads],
+        "series": [series[product] for product in sorted(series)]
+    }
+
+
+def client_stock_summary(party_id) -> dict:
+    """
+    Returns a party's stock totals (rows, bags, weight) overall and by product, chamber and bank.
+
+    Reads the precomputed stock_summaries rows of the current batch with one
+    primary-key range scan; rows loaded before batches existed are aggregated live.
+    """
+    batch_id = current_batch_id()
+    if batch_id is None:
+        groups = [
+            (dimension, total.value, total.rows, total.quantity, total.weight_kgs)
+            for dimension in StockSummary.DIMENSIONS
+            for total in db.session.execute(db.select(_summary_totals(
+                dimension, StocksData.batch_id.is_(None), StocksData.party_id == party_id
+            )))
+        ]
+    else:
+        groups = [
+            (summary.dimension, summary.value, summary.rows, summary.quantity, summary.weight_kgs)
+            for summary in StockSummary.query.filter_by(batch_id=batch_id, party_id=party_id)
+        ]
+
+    result = {"batch_id": str(batch_id) if batch_id else None}
+    for dimension in StockSummary.DIMENSIONS:
+        result[f"by_{dimension}"] = sorted(
+            (
+                {"value": value, "rows": rows, "quantity": int(quantity), "weight_kgs": float(weight_kgs)}
+                for group_dimension, value, rows, quantity, weight_kgs in groups
+                if group_dimension == dimension
+            ),
+            key=lambda total: total["value"]
+        )
+    by_product = result[f"by_{StockSummary.DIMENSIONS[0]}"]
+    result["totals"] = {
+        "rows": sum(total["rows"] for total in by_product),
+        "quantity": sum(total["quantity"] for total in by_product),
+        "weight_kgs": sum(total["weight_kgs"] for total in by_product)
+    }
+    return result
+
+
+def _summary_totals(dimension, *criteria):
+    """Subquery of stock totals per party and `dimension` value (blank values as "")."""
+    value = db.func.coalesce(getattr(StocksData, dimension), "")
+    return (
+        db.select(
+            StocksData.party_id.label("party_id"),
+            value.label("value"),
+            db.func.count().label("rows"),
+            db.func.coalesce(db.func.sum(StocksData.quantity), 0).label("quantity"),
+            db.func.coalesce(db.func.sum(StocksData.weight_kgs), 0.0).label("weight_kgs")
+        )
+        .where(*criteria)
+        .group_by(StocksData.party_id, value)
+        .subquery()
+    )
+
+
+def current_batch_id():
+    """
+    Returns the id of the current batch, or None before the first batched upload
+    (rows loaded before batches existed have batch_id NULL, so that still matches them).
+    """
+    return db.session.query(StockBatch.id).filter_by(status=StockBatch.STATUS_CURRENT).scalar()
+
+
+def job_serves_current_batch(job) -> bool:
+    """
+    True while an upload job's rows are what clients see: it is still queued or
+    running, or its batch (or that of the upload it duplicates) is the current one.
+
+    A repeat of an upload whose snapshot has since been superseded must be ingested
+    again rather than answered from the earlier job.
+    """
+    if job.status in (UploadJob.STATUS_QUEUED, UploadJob.STATUS_RUNNING):
+        return True
+    if job.status != UploadJob.STATUS_COMPLETED:
+        return False
+    return db.session.query(
+        StockBatch.query.filter_by(job_id=job.duplicate_of or job.id, status=StockBatch.STATUS_CURRENT).exists()
+    ).scalar()
+
+
+def page_client_stocks(
+    party_id, limit, cursor=None, include_total=False, filters=None, sort="-uploaded_on", columns=None
+):
+    """
+    Returns one page of a party's stock rows in the current batch.
+
+    Pages follow the (sort column, id) keyset, so every page is an index range
+    scan of `limit` + 1 rows however deep the client has scrolled.
+
+    Args:
+        party_id (str): Client's party id.
+        limit (int): Rows per page.
+        cursor (str): next_cursor of the previous page, or None for the first page.
+        include_total (bool): Also count every matching row.
+        filters (dict): Lists of accepted values per StocksData.FILTER_KEYS column,
+            plus date_from / date_to (inclusive).
+        sort (str): One of StocksData.SORT_KEYS; a leading "-" sorts descending.
+            Missing dates and numbers (NULL) always sort last; blank text cells are
+            stored as "", so they sort first ascending and last descending.
+        columns (list[str]): Only load these StocksData columns (all by default).
+
+    Returns:
+        tuple: (stocks, next_cursor, total); next_cursor is None on the last page
+            and total is None unless requested.
+
+    Raises:
+        ValueError: If the cursor is malformed or was issued for another sort.
+    """
+    base, queries = client_stocks_query(party_id, cursor, filters, sort, columns)
+    stocks = []
+    for query in queries:
+        stocks.extend(query.limit(limit + 1 - len(stocks)).all())
+        if len(stocks) > limit:
+            break
+
+    next_cursor = None
+    if len(stocks) > limit:
+        stocks = stocks[:limit]
+        last = stocks[-1]
+        value = getattr(last, sort.lstrip("-"))
+        next_cursor = helpers.encode_cursor({
+            "s": sort,
+            "v": value.isoformat() if isinstance(value, date) else value,
+            "i": str(last.id)
+        })
+
+    total = base.count() if include_total else None
+    return stocks, next_cursor, total
+
+
+def iter_client_stocks(
+    party_id, cursor=None, filters=None, sort="-uploaded_on", limit=None, batch_size=1000, columns=None
+):
+    """
+    Yields a party's stock rows in the current batch, fetched `batch_size` at a time.
+
+    Uses a server-side cursor (yield_per), so memory stays bounded by the batch
+    size however many rows the party has. Takes the same arguments as
+    page_client_stocks(); without a limit every remaining row is yielded.
+
+    Raises:
+        ValueError: If the cursor is malformed or was issued for another sort.
+    """
+    _, queries = client_stocks_query(party_id, cursor, filters, sort, columns)
+    if limit:
+        queries = [query.limit(limit) for query in queries]
+    stocks = chain.from_iterable(query.yield_per(batch_size) for query in queries)
+    yield from islice(stocks, limit) if limit else stocks
+
+
+def iter_export_stocks(party_id=None, filters=None, batch_size=1000):
+    """
+    Yields current-batch stock rows of one party, or of every party, for export.
+
+    Rows come from a server-side cursor (yield_per) ordered by party, upload time
+    and id, so a full-warehouse export runs in constant memory.
+    """
+    query = StocksData.query.filter_by(batch_id=current_batch_id())
+    if party_id:
+        query = query.filter_by(party_id=party_id)
+    query = filter_stocks(query, filters or {})
+    yield from (
+        query
+        .order_by(StocksData.party_id, StocksData.uploaded_on, StocksData.id)
+        .yield_per(batch_size)
+    )
+
+
+def client_stocks_query(party_id, cursor=None, filters=None, sort="-uploaded_on", columns=None):
+    """
+    Builds the queries for a party's stock rows in the current batch.
+
+    With `columns`, only those columns (plus id and the sort column the cursor
+    needs) are selected and hydrated.
+
+    A sort key that may be NULL (StocksData.NULLABLE_SORT_KEYS) gets two queries: rows
+    with a value, then rows without one. NULLs thus sort last in either direction
+    while each query stays one range scan of the (batch_id, party_id, column, id)
+    index, forwards or backwards.
+
+    Returns:
+        tuple: (base, queries) where base applies only the filters (for counting) and
+            queries, run in turn, return the rows after the cursor in (sort column, id) order.
+
+    Raises:
+        ValueError: If the cursor is malformed or was issued for another sort.
+    """
+    descending = sort.startswith("-")
+    sort_key = sort.lstrip("-")
+    column = getattr(StocksData, sort_key)
+    nullable = sort_key in StocksData.NULLABLE_SORT_KEYS
+
+    base = filter_stocks(
+        StocksData.query.filter_by(party_id=party_id, batch_id=current_batch_id()),
+        filters or {}
+    )
+    value = last_id = None
+    if cursor:
+        position = helpers.decode_cursor(cursor)
+        if position.get("s") != sort:
+            raise ValueError("Cursor was issued for another sort")
+        try:
+            value = _cursor_value(StocksData.__table__.c[sort_key], position["v"])
+            last_id = uuid.UUID(position["i"])
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"Invalid cursor: {e}")
+
+    id_order = StocksData.id.desc() if descending else StocksData.id.asc()
+    queries = []
+    if not nullable or value is not None or last_id is None:
+        query = base.filter(column.isnot(None)) if nullable else base
+        if last_id is not None:
+            key = db.tuple_(column, StocksData.id)
+            query = query.filter(key < (value, last_id) if descending else key > (value, last_id))
+        queries.append(query.order_by(column.desc() if descending else column.asc(), id_order))
+    if nullable:
+        # Trailing NULLs, in id order; a cursor inside them skips the ones already seen
+        query = base.filter(column.is_(None))
+        if value is None and last_id is not None:
+            query = query.filter(StocksData.id < last_id if descending else StocksData.id > last_id)
+        queries.append(query.order_by(id_order))
+
+    if columns:
+        load = load_only(*(getattr(StocksData, name) for name in {*columns, sort_key}))
+        queries = [query.options(load) for query in queries]
+    return base, queries
+
+
+def filter_stocks(query, filters):
+    """
+    Applies equality/IN filters on StocksData.FILTER_KEYS columns and an inclusive date range.
+    """
+    for key in StocksData.FILTER_KEYS:
+        values = filters.get(key)
+        if values:
+            column = getattr(StocksData, key)
+            query = query.filter(column == values[0] if len(values) == 1 else column.in_(values))
+    if filters.get("date_from"):
+        query = query.filter(StocksData.date >= filters["date_from"])
+    if filters.get("date_to"):
+        query = query.filter(StocksData.date <= filters["date_to"])
+    return query
+
+
+def _cursor_value(column, value):
+    """Restores a sort value stored in a cursor to the column's Python type."""
+    if value is None:
+        return None
+    if isinstance(column.type, db.DateTime):
+        return datetime.fromisoformat(value)
+    if isinstance(column.type, db.Date):
+        return date.fromisoformat(value)
+    return value
+
+
+def purge_superseded_batches(keep=0) -> int:
+    """
+    Deletes the stock rows of superseded batches, except the `keep` most recent ones.
+
+    Uses one set-based DELETE on stocks_data; the batch records stay (status "purged")
+    so upload history remains intact.
+
+    Returns:
+        int: Number of batches purged.
+    """
+    batch_ids = [
+        batch_id for (batch_id,) in db.session.query(StockBatch.id)
+        .filter_by(status=StockBatch.STATUS_SUPERSEDED)
+        .order_by(StockBatch.superseded_at.desc())
+        .offset(keep)
+    ]
+    if not batch_ids:
+        return 0
+
+    db.session.execute(StocksData.__table__.delete().where(StocksData.batch_id.in_(batch_ids)))
+    db.session.execute(StockSummary.__table__.delete().where(StockSummary.batch_id.in_(batch_ids)))
+    db.session.execute(
+        StockBatch.__table__.update()
+        .where(StockBatch.id.in_(batch_ids))
+        .values(status=StockBatch.STATUS_PURGED)
+    )
+    return len(batch_ids)
+
+
+def update_records_digest(digest, records):
+    """
+    Feeds parsed records into a hash in a normalized, formatting-independent form.
+
+    Two workbooks that parse to the same records produce the same digest, even if
+    their bytes differ (re-saved files, other cell styles or column widths).
+    """
+    for record in records:
+        values = [
+            "" if value is None or pd.isna(value) else value.isoformat() if isinstance(value, date) else repr(value)
+            for value in (record[key] for key in RECORD_KEYS)
+        ]
+        digest.update("\x1f".join(values).encode("utf-8"))
+        digest.update(b"\x1e")
+
+
+def build_stock_rows(records, parties, uploaded_by, uploaded_on=None, batch_id=None):
+    """
+    Turns parsed stock records into stocks_data rows ready for bulk insert.
+
+    Args:
+        records (list[dict]): Records from StockParser.
+        parties (PartyResolver): Resolver from load_party_resolver().
+        uploaded_by (str | UUID): Id of the uploading user.
+        uploaded_on (datetime): Upload timestamp shared by all rows (defaults to now).
+        batch_id (UUID): Batch the rows belong to.
+
+    Returns:
+        tuple: (rows, skipped) where skipped counts records with no matching client.
+    """
+    uploaded_by = uuid.UUID(str(uploaded_by)) if uploaded_by else None
+    uploaded_on = uploaded_on or datetime.utcnow()
+
+    rows = []
+    skipped = 0
+    for record in records:
+        party_id = parties.resolve(record["party_name"])
+        if not party_id:
+            skipped += 1
+            continue
+
+        row = {field: record[field] for field in RECORD_FIELDS}
+        row["id"] = uuid.uuid4()
+        row["party_id"] = party_id
+        row["party_name"] = record["party_name"]
+        # Blank date cells parse to NaT, which the database cannot store
+        row["date"] = record["date"] if isinstance(record["date"], date) and not pd.isna(record["date"]) else None
+        row["uploaded_on"] = uploaded_on
+        row["uploaded_by"] = uploaded_by
+        row["batch_id"] = batch_id
+        rows.append(row)
+
+    return rows, skipped
+
+
+def bulk_insert_stocks(rows) -> int:
+    """
+    Writes stocks_data rows inside the current session transaction.
+
+    Uses COPY FROM STDIN on PostgreSQL and a batched executemany insert elsewhere.
+
+    Returns:
+        int: Number of rows written.
+    """
+    if not rows:
+        return 0
+
+    connection = db.session.connection()
+    if connection.dialect.name == "postgresql":
+        _copy_rows(connection, StocksData.__tablename__, STOCK_COLUMNS, rows)
+    else:
+        connection.execute(StocksData.__table__.insert(), rows)
+    return len(rows)
+
+
+def _copy_rows(connection, table, columns, rows):
+    """
+    Streams rows into `table` with COPY FROM STDIN (text format) over the session's connection.
+    """
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write("\t".join(_copy_value(row[column]) for column in columns))
+        buffer.write("\n")
+    buffer.seek(0)
+
+    cursor = connection.connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN", buffer)
+    finally:
+        cursor.close()
+
+
+def _copy_value(value) -> str:
+    """Encodes one value for COPY text format."""
+    if value is None:
+        return "\\N"
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
@@ -0,0 +1,211 @@
+# app/tasks.py
+# ------------------------------------------------------------
+# Background jobs: stock workbook ingestion off the request thread
+# ------------------------------------------------------------
+
+import hashlib
+import os
+import shutil
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+
+from flask import current_app
+
+from app.config.config_loader import config_loader
+from app.config.logger_loader import app_logger
+from app.extensions import db
+from app.models.stock_batch import StockBatch
+from app.models.stock_upload import StockUpload
+from app.models.upload_job import UploadJob
+from app.services import stock_service
+from app.services.stock_cache import get_stock_cache
+from app.services.stock_search import invalidate_search_index
+from app.utils.helpers import StockParseError
+
+_executor = None
+
+# Flask app of a process-pool worker, created once per child process
+_worker_app = None
+
+
+def get_executor():
+    """
+    Returns the shared job executor, creating it from the "jobs" config on first use.
+
+    "executor": "thread" (default) runs jobs on a thread pool inside this process;
+    "process" runs them in a process pool so parsing never competes with request handling.
+    """
+    global _executor
+    if _executor is None:
+        jobs_cfg = config_loader.config.get("jobs", {})
+        max_workers = jobs_cfg.get("max_workers", 2)
+        if jobs_cfg.get("executor", "thread") == "process":
+            _executor = ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker_app)
+        else:
+            _executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="stock-ingest")
+    return _executor
+
+
+def enqueue_stock_ingestion(job_id):
+    """
+    Schedules a queued UploadJob for background processing.
+    """
+    executor = get_executor()
+    if isinstance(executor, ProcessPoolExecutor):
+        executor.submit(_run_in_worker_process, str(job_id))
+    else:
+        executor.submit(run_stock_ingestion, current_app._get_current_object(), str(job_id))
+
+
+def run_stock_ingestion(app, job_id):
+    """
+    Parses and inserts the job's stored files, recording progress and outcome on the job.
+    """
+    with app.app_context():
+        job = db.session.get(UploadJob, _as_uuid(job_id))
+        if not job:
+            app_logger.error(f"Upload job {job_id} not found")
+            return
+
+        file_path = job.file_path
+        _update_job(job.id, status=UploadJob.STATUS_RUNNING, started_at=datetime.utcnow())
+
+        try:
+            dedupe_records = config_loader.config.get("uploads", {}).get("dedupe_records", False)
+            records_digest = hashlib.sha256() if dedupe_records else None
+            # Same records as an upload that is still current: stop before inserting anything
+            counts = stock_service.ingest_stock_files(
+                _job_sources(file_path),
+                job.created_by,
+                on_progress=lambda progress: _report_progress(job.id, progress),
+                records_digest=records_digest,
+                job_id=job.id,
+                find_duplicate=lambda records_hash: _find_records_duplicate(records_hash, job.id)
+            )
+
+            if records_digest is not None:
+                upload = StockUpload.query.filter_by(job_id=job.id).first()
+                if upload:
+                    upload.records_hash = records_digest.hexdigest()
+            original = counts["duplicate_of"]
+            if original:
+                job.duplicate_of = original.job_id
+                app_logger.info(f"Upload job {job_id} duplicates job {original.job_id}")
+
+            affected_parties = set()
+            if not job.duplicate_of:
+                affected_parties = stock_service.activate_batch(counts["batch_id"], counts["rows_inserted"])
+
+            job.status = UploadJob.STATUS_COMPLETED
+            job.rows_parsed = counts["rows_parsed"]
+            job.rows_inserted = counts["rows_inserted"]
+            job.rows_skipped = counts["rows_skipped"]
+            job.sheets = counts["sheets"]
+            job.finished_at = datetime.utcnow()
+            db.session.commit()  # stock rows, snapshot swap and final job state land together
+            if affected_parties is None:
+                get_stock_cache().clear()
+            else:
+                get_stock_cache().invalidate_parties(affected_parties)
+            if not job.duplicate_of:
+                invalidate_search_index()
+            app_logger.info(
+                f"Upload job {job_id} completed: {job.rows_parsed} parsed, {job.rows_inserted} inserted, "
+                f"{job.rows_skipped} skipped from {len(job.sheets)} sheet(s)"
+            )
+
+        except StockParseError as e:
+            db.session.rollback()
+            _fail_job(job.id, str(e), getattr(e, "sheets", None))
+
+        except Exception as e:
+            db.session.rollback()
+            app_logger.exception(f"Upload job {job_id} failed:")
+            _fail_job(job.id, "Internal server error while processing stocks.")
+
+        finally:
+            db.session.remove()
+            if os.path.isdir(file_path):
+                shutil.rmtree(file_path, ignore_errors=True)
+            elif os.path.exists(file_path):
+                os.remove(file_path)
+
+
+def _job_sources(file_path):
+    """
+    Returns (display name, path) for each file of a job.
+
+    A job's files live in one directory, stored as "<index>_<name>" to keep upload order.
+    """
+    if not os.path.isdir(file_path):
+        return [(os.path.basename(file_path), file_path)]
+    return [
+        (entry.split("_", 1)[-1], os.path.join(file_path, entry))
+        for entry in sorted(os.listdir(file_path))
+    ]
+
+
+def _find_records_duplicate(records_hash, job_id):
+    """
+    Returns the earlier upload whose parsed records hash to `records_hash` and
+    whose batch is still the current one; superseded records are loaded again.
+    """
+    return (
+        StockUpload.query
+        .join(UploadJob, StockUpload.job_id == UploadJob.id)
+        .join(StockBatch, StockBatch.job_id == UploadJob.id)
+        .filter(
+            StockUpload.records_hash == records_hash,
+            StockUpload.job_id != job_id,
+            UploadJob.status == UploadJob.STATUS_COMPLETED,
+            UploadJob.duplicate_of.is_(None),
+            StockBatch.status == StockBatch.STATUS_CURRENT
+        )
+        .first()
+    )
+
+
+def _fail_job(job_id, error, sheets=None):
+    """
+    Marks a job failed and forgets its file fingerprint so the same file can be retried.
+    """
+    _update_job(job_id, status=UploadJob.STATUS_FAILED, error=error, sheets=sheets, finished_at=datetime.utcnow())
+    with db.engine.begin() as connection:
+        connection.execute(StockUpload.__table__.delete().where(StockUpload.__table__.c.job_id == job_id))
+
+
+def _report_progress(job_id, progress):
+    """
+    Publishes running counts while the ingest transaction is still open.
+
+    SQLite allows a single writer, so progress is only published on servers that
+    can update upload_jobs from a second connection; the final counts are always stored.
+    """
+    if db.engine.dialect.name == "sqlite":
+        return
+    _update_job(job_id, **progress)
+
+
+def _update_job(job_id, **values):
+    """
+    Updates an upload_jobs row on its own connection, committed immediately.
+    """
+    table = UploadJob.__table__
+    with db.engine.begin() as connection:
+        connection.execute(table.update().where(table.c.id == job_id).values(**values))
+
+
+def _init_worker_app():
+    """Process-pool initializer: each worker process builds its own app and DB engine."""
+    global _worker_app
+    from app import create_app
+    _worker_app = create_app()
+
+
+def _run_in_worker_process(job_id):
+    run_stock_ingestion(_worker_app, job_id)
+
+
+def _as_uuid(value):
+    return value if isinstance(value, uuid.UUID) else uuid.UUID(str(value))
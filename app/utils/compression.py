@@ -0,0 +1,118 @@
+# app/utils/compression.py
+# ------------------------------------------------------------
+# gzip / brotli response compression negotiated via Accept-Encoding
+# ------------------------------------------------------------
+
+import zlib
+
+from flask import Flask, request
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+# Content types worth compressing; images, archives and XLSX files are already compressed
+COMPRESSIBLE_MIMETYPES = {
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+    "text/csv",
+    "text/css",
+    "text/html",
+    "text/plain",
+    "text/xml",
+}
+
+
+def init_compression(app: Flask, config: dict):
+    """
+    Registers response compression on the app.
+
+    Config keys ("compression" in env.json):
+        enabled: Turn compression on (default true).
+        min_size: Smallest body, in bytes, worth compressing (default 1024).
+            Streamed bodies have no known size and are always compressed.
+        gzip_level: 1-9 (default 6).
+        brotli_level: 0-11 (default 4); used when the brotli package is installed.
+    """
+    if not config.get("enabled", True):
+        return
+
+    min_size = config.get("min_size", 1024)
+    gzip_level = config.get("gzip_level", 6)
+    brotli_level = config.get("brotli_level", 4)
+
+    @app.after_request
+    def compress_response(response):
+        if (
+            response.status_code < 200
+            or response.status_code in (204, 206, 304)
+            or response.direct_passthrough
+            or "Content-Encoding" in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES
+        ):
+            return response
+
+        response.vary.add("Accept-Encoding")
+        encoding = _negotiate_encoding()
+        if encoding is None:
+            return response
+
+        level = brotli_level if encoding == "br" else gzip_level
+        if response.is_streamed:
+            response.response = _compress_stream(response.response, encoding, level)
+            response.headers.pop("Content-Length", None)
+        else:
+            data = response.get_data()
+            if len(data) < min_size:
+                return response
+            response.set_data(_compress_bytes(data, encoding, level))
+
+        response.headers["Content-Encoding"] = encoding
+        return response
+
+
+def _negotiate_encoding():
+    """Returns "br" or "gzip", whichever the client accepts (brotli first), or None."""
+    accepted = request.accept_encodings
+    if brotli is not None and accepted["br"]:
+        return "br"
+    if accepted["gzip"]:
+        return "gzip"
+    return None
+
+
+def _compress_bytes(data: bytes, encoding: str, level: int) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data, quality=level)
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits 31: gzip container
+    return compressor.compress(data) + compressor.flush()
+
+
+def _compress_stream(chunks, encoding: str, level: int):
+    """
+    Compresses a streamed body chunk by chunk, flushing after each one so clients
+    receive data as soon as the application produces it.
+    """
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=level)
+        compress, flush, finish = compressor.process, compressor.flush, compressor.finish
+    else:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+        compress, finish = compressor.compress, compressor.flush
+        flush = lambda: compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode("utf-8")
+            if chunk:
+                yield compress(chunk) + flush()
+        yield finish()
+    finally:
+        close = getattr(chunks, "close", None)
+        if close:
+            close()
@@ -0,0 +1,69 @@
+# app/utils/decorators.py
+# ------------------------------------------------------------
+# Route decorators: JWT cookie auth plus the caller's cached principal
+# ------------------------------------------------------------
+
+from functools import wraps
+
+from flask import g, jsonify
+from flask_jwt_extended import get_jwt, get_jwt_identity, jwt_required
+
+from app.services.principal_cache import load_principal
+
+
+def current_principal():
+    """Returns the Principal resolved by the decorator of the current request."""
+    return g.principal
+
+
+def principal_required(fn):
+    """Requires a valid access cookie of an existing, active user of any role."""
+    @wraps(fn)
+    @jwt_required(locations=["cookies"])
+    def wrapper(*args, **kwargs):
+        principal = load_principal(get_jwt_identity())
+        if principal is None:
+            return jsonify({"error": "User not found"}), 404
+        if not principal.is_active:
+            return jsonify({"error": "Account is deactivated"}), 403
+
+        g.principal = principal
+        return fn(*args, **kwargs)
+    return wrapper
+
+
+def admin_required(fn):
+    """Requires an active admin; the principal is available through current_principal()."""
+    @wraps(fn)
+    @jwt_required(locations=["cookies"])
+    def wrapper(*args, **kwargs):
+        # The role claim rejects non-admins before any cache or DB lookup
+        if get_jwt().get("role") != "admin":
+            return jsonify({"error": "Admin access required"}), 403
+
+        principal = load_principal(get_jwt_identity())
+        if principal is None or principal.role != "admin" or not principal.is_active:
+            return jsonify({"error": "Admin access required"}), 403
+
+        g.principal = principal
+        return fn(*args, **kwargs)
+    return wrapper
+
+
+def client_required(fn):
+    """Requires an active client with a client profile; current_principal().party_id is set."""
+    @wraps(fn)
+    @jwt_required(locations=["cookies"])
+    def wrapper(*args, **kwargs):
+        if get_jwt().get("role") != "client":
+            return jsonify({"error": "Unauthorized"}), 403
+
+        principal = load_principal(get_jwt_identity())
+        if principal is None or principal.role != "client" or not principal.is_active:
+            return jsonify({"error": "Unauthorized"}), 403
+        if principal.party_id is None:
+            return jsonify({"error": "Client not found"}), 404
+
+        g.principal = principal
+        return fn(*args, **kwargs)
+    return wrapper
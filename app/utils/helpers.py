@@ -3,11 +3,22 @@
 # Reusable utility/helper functions across the application
 # ------------------------------------------------------------
 
+import base64
+import csv
+import hashlib
+import json
 import os
+import pickle
 import secrets
 import string
+import zipfile
+import numpy as np
 import pandas as pd
 from datetime import datetime
+from pathlib import Path
+from typing import Iterator
+from openpyxl import load_workbook
+from openpyxl.cell.cell import TYPE_ERROR, TYPE_NUMERIC
 
 
 # ---------- 🔒 General Utility Methods ----------
@@ -38,6 +49,62 @@ class helpers:
         """
         return ''.join(secrets.choice(string.digits) for _ in range(length))
 
+    @staticmethod
+    def save_and_hash(file_storage, path, block_size=1024 * 1024):
+        """
+        Saves an uploaded file to `path` and returns the SHA-256 hex digest of its bytes.
+        """
+        digest = hashlib.sha256()
+        with open(path, "wb") as f:
+            for block in iter(lambda: file_storage.stream.read(block_size), b""):
+                digest.update(block)
+                f.write(block)
+        return digest.hexdigest()
+
+    @staticmethod
+    def parse_fields(value, allowed) -> list[str] | None:
+        """
+        Parses a comma-separated `fields=` parameter into field names, in the order of `allowed`.
+
+        Returns:
+            list | None: The requested fields, or None when the parameter is absent or blank.
+
+        Raises:
+            ValueError: If a field is not in `allowed`.
+        """
+        requested = {name.strip() for name in (value or "").split(",") if name.strip()}
+        if not requested:
+            return None
+        unknown = requested - set(allowed)
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+        return [name for name in allowed if name in requested]
+
+    @staticmethod
+    def encode_cursor(values: dict) -> str:
+        """
+        Packs keyset pagination values into an opaque, URL-safe cursor token.
+        """
+        raw = json.dumps(values, separators=(",", ":")).encode("utf-8")
+        return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+    @staticmethod
+    def decode_cursor(token: str) -> dict:
+        """
+        Unpacks a token from encode_cursor().
+
+        Raises:
+            ValueError: If the token is malformed.
+        """
+        try:
+            raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+            values = json.loads(raw)
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"Invalid cursor: {e}")
+        if not isinstance(values, dict):
+            raise ValueError("Invalid cursor")
+        return values
+
 
 # ---------- 📊 Stock Excel Parser ----------
 class StockParseError(Exception):
@@ -45,7 +112,43 @@ class StockParseError(Exception):
     pass
 
 
+class EmptySheetError(StockParseError):
+    """Raised when a sheet holds no stock records at all."""
+    pass
+
+
 class StockParser:
+    ENGINES = ("vectorized", "rows")
+
+    # Cell values treated as blank, and first-column markers of non-data rows.
+    NULL_TOKENS = ["-", "N/A", "NA"]
+    SKIP_ROW_MARKERS = ["PARTY TOTAL", "S NO", ""]
+
+    # Record fields after party_name/s_no: (key, column position, cleaner kind).
+    FIELDS = [
+        ("bank", 1, "str"),
+        ("lot_no", 2, "str"),
+        ("date", 3, "date"),
+        ("mark", 4, "str"),
+        ("lorry", 5, "str"),
+        ("product", 6, "str"),
+        ("packing", 7, "float"),
+        ("quantity", 8, "int"),
+        ("weight_kgs", 9, "float"),
+        ("chamber", 10, "str"),
+        ("floor", 11, "str"),
+        ("bayee", 12, "str"),
+    ]
+    LAST_COLUMN = 12
+
+    # Upload formats by file suffix; each format is read by StockParser.iter_<format>_frames().
+    FORMATS = {".xlsx": "excel", ".xls": "excel", ".csv": "csv", ".parquet": "parquet"}
+    SOURCE_SUFFIXES = tuple(FORMATS)
+    ARCHIVE_SUFFIXES = (".zip",)
+
+    INT_PATTERN = r"\s*[+-]?\d(?:_?\d)*\s*"
+    FLOAT_PATTERN = r"[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?"
+
     @staticmethod
     def clean_str(value):
         """Returns clean string or empty if blank, '-', or 'N/A'."""
@@ -81,12 +184,35 @@ class StockParser:
             return None
 
     @staticmethod
-    def extract_stock_data(filepath: str) -> list[dict]:
+    def read_sheet(filepath, sheet_name: str | None = None) -> pd.DataFrame:
+        """
+        Loads a sheet (the first one by default) as a raw, header-less DataFrame.
+
+        CSV and Parquet files have a single sheet and are read through their frame readers.
+
+        Raises:
+            StockParseError: If the file cannot be opened or parsed.
         """
-        Extracts structured stock data from Excel and raises critical errors for API use.
+        if StockParser.source_format(filepath) != "excel":
+            frames = list(StockParser.iter_sheet_frames(filepath))
+            return pd.concat(frames) if frames else pd.DataFrame(dtype=object)
+
+        try:
+            xls = pd.ExcelFile(filepath)
+            return xls.parse(sheet_name or xls.sheet_names[0], header=None, keep_default_na=False)
+        except Exception as e:
+            raise StockParseError(f"❌ Failed to open or parse Excel file: {str(e)}")
+
+    @staticmethod
+    def extract_stock_data(filepath: str, engine: str = "vectorized", sheet_name: str | None = None) -> list[dict]:
+        """
+        Extracts structured stock data from Excel, CSV or Parquet and raises critical errors for API use.
 
         Args:
-            filepath (str): Path to the Excel file.
+            filepath (str): Path to the stock file.
+            engine (str): "vectorized" (column-wise, default) or "rows" (row-by-row loop).
+                Both return identical records and raise identical errors.
+            sheet_name (str): Sheet to read; the first sheet by default.
 
         Returns:
             List[dict]: Cleaned list of stock records.
@@ -94,14 +220,339 @@ class StockParser:
         Raises:
             StockParseError: On any critical structure issue.
         """
+        if engine not in StockParser.ENGINES:
+            raise ValueError(f"Unknown stock parser engine: {engine}")
+
+        df = StockParser.read_sheet(filepath, sheet_name)
+
+        if engine == "rows":
+            records, _ = StockParser.parse_rows(df)
+        else:
+            records, _ = StockParser.parse_columns(df)
+
+        if not records:
+            raise EmptySheetError("❌ No valid stock records found in the file.")
+
+        return records
+
+    @staticmethod
+    def iter_stock_chunks(
+        filepath, chunk_size: int = 5000, sheet_name: str | None = None, errors: list | None = None
+    ) -> Iterator[list[dict]]:
+        """
+        Streams validated stock records in chunks of at most `chunk_size`.
+
+        The file is read window by window by its format's frame reader (see
+        iter_sheet_frames()) and parsed with the vectorized engine, so memory stays
+        bounded by the chunk size rather than the sheet size. Records and errors match
+        extract_stock_data(); rows are padded to the 13 stock columns.
+
+        Args:
+            errors (list): If given, invalid rows are appended to it and skipped
+                instead of stopping the parse (see parse_columns()).
+
+        Raises:
+            StockParseError: On any critical structure issue. Chunks yielded before
+                the error have already been handed to the caller.
+        """
+        current_party = None
+        buffer = []
+        found = False
+
+        for frame in StockParser.iter_sheet_frames(filepath, chunk_size, sheet_name):
+            records, current_party = StockParser.parse_columns(frame, current_party, errors)
+            buffer.extend(records)
+            while len(buffer) >= chunk_size:
+                found = True
+                yield buffer[:chunk_size]
+                buffer = buffer[chunk_size:]
+
+        if buffer:
+            found = True
+            yield buffer
+
+        if not found:
+            raise EmptySheetError("❌ No valid stock records found in the file.")
+
+    @staticmethod
+    def spool_sheet(filepath, spool_path, sheet_name: str | None = None, chunk_size: int = 5000):
+        """
+        Parses one whole sheet into a spool file, chunk by chunk; the unit of work fanned
+        out across parse worker processes. Read the chunks back with iter_spooled_chunks().
+
+        Returns:
+            tuple: (rows, error) where error is the StockParseError that stopped the
+                sheet (the spool is then incomplete and must not be loaded), or None.
+        """
+        rows = 0
         try:
-            xls = pd.ExcelFile(filepath)
-            df = xls.parse(xls.sheet_names[0], header=None, keep_default_na=False)
+            with open(spool_path, "wb") as spool:
+                for chunk in StockParser.iter_stock_chunks(filepath, chunk_size, sheet_name):
+                    pickle.dump(chunk, spool, protocol=pickle.HIGHEST_PROTOCOL)
+                    rows += len(chunk)
+            return rows, None
+        except StockParseError as e:
+            return rows, e
+
+    @staticmethod
+    def iter_spooled_chunks(spool_path) -> Iterator[list]:
+        """
+        Yields the record chunks written by spool_sheet(), one at a time.
+        """
+        with open(spool_path, "rb") as spool:
+            while True:
+                try:
+                    yield pickle.load(spool)
+                except EOFError:
+                    return
+
+    @staticmethod
+    def validate_sheet(filepath, sheet_name: str | None = None, chunk_size: int = 5000):
+        """
+        Parses one whole sheet without stopping at invalid rows, for dry-run uploads.
+
+        Returns:
+            tuple: (party_rows, errors, error) where party_rows maps each party name to
+                its valid record count, errors lists the invalid rows ({"row", "error"}),
+                and error is the StockParseError that stopped the sheet, or None.
+        """
+        party_rows, errors = {}, []
+        try:
+            for chunk in StockParser.iter_stock_chunks(filepath, chunk_size, sheet_name, errors):
+                for record in chunk:
+                    party_rows[record["party_name"]] = party_rows.get(record["party_name"], 0) + 1
+            return party_rows, errors, None
+        except EmptySheetError as e:
+            # Every row was invalid: the row errors already explain the sheet
+            return party_rows, errors, (None if errors else e)
+        except StockParseError as e:
+            return party_rows, errors, e
+
+    @staticmethod
+    def list_sheets(filepath) -> list[str]:
+        """
+        Returns the sheet names of a workbook, in workbook order.
+
+        CSV and Parquet files hold a single, unnamed sheet: [None].
+
+        Raises:
+            StockParseError: If the file cannot be opened.
+        """
+        if StockParser.source_format(filepath) != "excel":
+            return [None]
+        try:
+            if StockParser._is_legacy_xls(filepath):
+                return pd.ExcelFile(filepath).sheet_names
+            workbook = load_workbook(filepath, read_only=True, keep_links=False)
+            try:
+                return workbook.sheetnames
+            finally:
+                workbook.close()
+        except Exception as e:
+            raise StockParseError(f"❌ Failed to open or parse Excel file: {str(e)}")
+
+    @staticmethod
+    def expand_sources(sources, extract_dir) -> list[tuple[str, str]]:
+        """
+        Expands uploaded files into the stock files to parse, unpacking ZIP archives.
+
+        Archive members are written to `extract_dir` under flat, numbered names, so
+        member paths never escape it; folders and hidden or lock files are ignored.
+
+        Args:
+            sources (list[tuple[str, str]]): (display name, path) of each uploaded file.
+            extract_dir (str): Directory for extracted archive members.
+
+        Returns:
+            list[tuple[str, str]]: (display name, path) of each stock file, in upload order.
+
+        Raises:
+            StockParseError: If an archive is unreadable or holds no stock file.
+        """
+        workbooks = []
+        for name, path in sources:
+            if not name.lower().endswith(StockParser.ARCHIVE_SUFFIXES):
+                workbooks.append((name, path))
+                continue
+
+            try:
+                with zipfile.ZipFile(path) as archive:
+                    members = [
+                        member for member in archive.infolist()
+                        if not member.is_dir()
+                        and not member.filename.startswith("__MACOSX/")
+                        and not Path(member.filename).name.startswith((".", "~$"))
+                        and member.filename.lower().endswith(StockParser.SOURCE_SUFFIXES)
+                    ]
+                    if not members:
+                        raise StockParseError(f"❌ No stock files (Excel, CSV or Parquet) found in {name}")
+                    for member in members:
+                        target = Path(extract_dir) / f"{len(workbooks):04d}_{Path(member.filename).name}"
+                        with archive.open(member) as src, open(target, "wb") as dst:
+                            while block := src.read(1024 * 1024):
+                                dst.write(block)
+                        workbooks.append((f"{name}/{member.filename}", str(target)))
+            except zipfile.BadZipFile as e:
+                raise StockParseError(f"❌ Failed to open ZIP archive {name}: {str(e)}")
+
+        return workbooks
+
+    @staticmethod
+    def source_format(filepath) -> str:
+        """
+        Returns the format name of a stock file from its suffix; file-like objects are read as Excel.
+        """
+        if not isinstance(filepath, (str, os.PathLike)):
+            return "excel"
+        return StockParser.FORMATS.get(Path(filepath).suffix.lower(), "excel")
+
+    @staticmethod
+    def _is_legacy_xls(filepath) -> bool:
+        return isinstance(filepath, (str, os.PathLike)) and str(filepath).lower().endswith(".xls")
+
+    @staticmethod
+    def iter_sheet_frames(filepath, chunk_size: int = 5000, sheet_name: str | None = None) -> Iterator[pd.DataFrame]:
+        """
+        Reads a sheet (the first one by default) in row windows of `chunk_size`,
+        as header-less object frames, using the reader of the file's format.
+
+        Every reader yields frames with positional integer columns, blank cells as
+        "", and an index holding each row's 0-based position in the file, so all
+        formats feed parse_columns() the same way.
+        """
+        reader = getattr(StockParser, f"iter_{StockParser.source_format(filepath)}_frames")
+        return reader(filepath, chunk_size, sheet_name)
+
+    @staticmethod
+    def iter_excel_frames(filepath, chunk_size: int = 5000, sheet_name: str | None = None) -> Iterator[pd.DataFrame]:
+        """
+        Streams an Excel sheet with openpyxl's read-only mode.
+
+        Cells are converted the same way pandas' openpyxl reader does. Legacy .xls
+        files cannot be streamed by openpyxl; they are read whole and windowed.
+        """
+        if StockParser._is_legacy_xls(filepath):
+            df = StockParser.read_sheet(filepath, sheet_name)
+            for start in range(0, len(df), chunk_size):
+                yield df.iloc[start:start + chunk_size]
+            return
+
+        try:
+            workbook = load_workbook(filepath, read_only=True, data_only=True, keep_links=False)
+            sheet = workbook[sheet_name] if sheet_name else workbook.worksheets[0]
+            sheet.reset_dimensions()
         except Exception as e:
             raise StockParseError(f"❌ Failed to open or parse Excel file: {str(e)}")
 
+        try:
+            offset = 0
+            window = []
+            for row in sheet.rows:
+                window.append([StockParser._convert_cell(cell) for cell in row])
+                if len(window) == chunk_size:
+                    yield StockParser._window_frame(window, offset)
+                    offset += len(window)
+                    window = []
+            if window:
+                yield StockParser._window_frame(window, offset)
+        finally:
+            workbook.close()
+
+    @staticmethod
+    def iter_csv_frames(filepath, chunk_size: int = 5000, sheet_name: str | None = None) -> Iterator[pd.DataFrame]:
+        """
+        Streams a CSV export with the csv module, `chunk_size` lines at a time.
+
+        Rows may be ragged (trailing commas, extra cells after a party header); each
+        window is padded to its widest row by _window_frame(), as Excel windows are.
+        Every cell is kept as text, as typed in the report; the cleaning step
+        converts serial numbers, quantities and dates exactly as for Excel text cells.
+        """
+        try:
+            with open(filepath, newline="", encoding="utf-8-sig") as f:
+                window, offset = [], 0
+                for row in csv.reader(f):
+                    window.append(row)
+                    if len(window) == chunk_size:
+                        yield StockParser._window_frame(window, offset)
+                        offset += len(window)
+                        window = []
+                if window:
+                    yield StockParser._window_frame(window, offset)
+        except (OSError, UnicodeDecodeError, csv.Error) as e:
+            raise StockParseError(f"❌ Failed to open or parse CSV file: {str(e)}")
+
+    @staticmethod
+    def iter_parquet_frames(filepath, chunk_size: int = 5000, sheet_name: str | None = None) -> Iterator[pd.DataFrame]:
+        """
+        Streams a Parquet export record batch by record batch with pyarrow.
+
+        Columns are taken by position, whatever their names; only the first
+        LAST_COLUMN + 1 are converted. Typed columns arrive as numbers and dates from the
+        Arrow buffers, so the cleaning step skips the text round trip that Excel and
+        CSV cells need. Only columns with missing values are converted to object
+        (to blank them); the rest keep their dtype until parse_columns() reads them.
+        """
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise StockParseError("❌ Parquet uploads require the pyarrow package.")
+
+        try:
+            parquet_file = pq.ParquetFile(filepath)
+        except Exception as e:
+            raise StockParseError(f"❌ Failed to open or parse Parquet file: {str(e)}")
+
+        try:
+            offset = 0
+            for batch in parquet_file.iter_batches(batch_size=chunk_size):
+                batch = batch.select(range(min(batch.num_columns, StockParser.LAST_COLUMN + 1)))
+                frame = batch.to_pandas()
+                frame.columns = range(frame.shape[1])
+                for position, column in enumerate(batch.columns):
+                    if column.null_count:
+                        frame[position] = frame[position].astype(object).where(frame[position].notna(), "")
+                frame.index = range(offset, offset + len(frame))
+                offset += len(frame)
+                if frame.shape[1] <= StockParser.LAST_COLUMN:
+                    frame = frame.reindex(columns=range(StockParser.LAST_COLUMN + 1), fill_value="")
+                yield frame
+        except StockParseError:
+            raise
+        except Exception as e:
+            raise StockParseError(f"❌ Failed to open or parse Parquet file: {str(e)}")
+        finally:
+            parquet_file.close()
+
+    @staticmethod
+    def _convert_cell(cell):
+        """Mirrors pandas' openpyxl cell conversion (keep_default_na=False)."""
+        if cell.value is None:
+            return ""
+        if cell.data_type == TYPE_ERROR:
+            return np.nan
+        if cell.data_type == TYPE_NUMERIC:
+            value = int(cell.value)
+            return value if value == cell.value else float(cell.value)
+        return cell.value
+
+    @staticmethod
+    def _window_frame(window: list[list], offset: int) -> pd.DataFrame:
+        """Pads a window of raw rows to a common width and wraps it in a DataFrame."""
+        width = max(StockParser.LAST_COLUMN + 1, *(len(row) for row in window))
+        rows = [row + [""] * (width - len(row)) for row in window]
+        return pd.DataFrame(rows, index=range(offset, offset + len(rows)), dtype=object)
+
+    @staticmethod
+    def parse_rows(df: pd.DataFrame, current_party: str | None = None) -> tuple[list[dict], str | None]:
+        """
+        Row-by-row engine: walks the sheet with iterrows() and cleans one cell at a time.
+
+        Returns:
+            Tuple of the parsed records and the party in effect after the last row,
+            so consecutive windows of one sheet can be parsed in sequence.
+        """
         records = []
-        current_party = None
 
         for idx, row in df.iterrows():
             first_cell = str(row[0]).strip().upper()
@@ -114,7 +565,7 @@ class StockParser:
                 continue
 
             # Skip known junk/header/total rows
-            if first_cell in ["PARTY TOTAL", "S NO", ""]:
+            if first_cell in StockParser.SKIP_ROW_MARKERS:
                 continue
 
             if current_party is None:
@@ -152,11 +603,162 @@ class StockParser:
             except Exception as e:
                 raise StockParseError(f"❌ Failed to parse row {idx + 1}: {str(e)}")
 
-        if not records:
-            raise StockParseError("❌ No valid stock records found in the file.")
+        return records, current_party
 
-        return records
+    @staticmethod
+    def parse_columns(
+        df: pd.DataFrame, current_party: str | None = None, errors: list | None = None
+    ) -> tuple[list[dict], str | None]:
+        """
+        Vectorized engine: same rules as parse_rows(), applied to whole columns.
+
+        Party headers are detected with boolean masks and forward-filled, junk/total
+        rows are masked out, and numeric/date cells are coerced in batches.
+
+        With an `errors` list, rows that would raise are appended to it as
+        {"row": row number, "error": reason} and left out of the records instead.
+        """
+        if df.shape[1] <= StockParser.LAST_COLUMN:
+            # Narrow sheets (e.g. legacy .xls) get blank trailing cells, as _window_frame pads streamed windows.
+            padding = pd.DataFrame(
+                "", index=df.index, columns=range(df.shape[1], StockParser.LAST_COLUMN + 1), dtype=object
+            )
+            df = pd.concat([df, padding], axis=1)
 
+        values = df.values
+        row_numbers = df.index.to_numpy() + 1
+
+        first = pd.Series(values[:, 0], dtype=object).astype(str).str.strip()
+        second = pd.Series(values[:, 1], dtype=object).astype(str).str.strip()
+        third = pd.Series(values[:, 2], dtype=object).astype(str).str.strip()
+        first_upper = first.str.upper()
+
+        # Party header rows: text in column A only; "... TOTAL" headers are skipped.
+        header = ((first != "") & (second == "") & (third == "")).to_numpy()
+        party_header = header & ~first_upper.str.contains("TOTAL", regex=False).to_numpy()
+        names = first.str.lower().str.split().str.join(" ").str.title().to_numpy()
+
+        # Forward-fill: each row takes the name from the latest party header above it,
+        # or the party carried in from the previous window.
+        last_header = np.maximum.accumulate(np.where(party_header, np.arange(len(df)), -1))
+        party = np.where(last_header >= 0, names[last_header], current_party)
+        has_party = pd.notna(party)
+
+        candidate = ~header & ~first_upper.isin(StockParser.SKIP_ROW_MARKERS).to_numpy()
+        s_no = StockParser._to_serial_numbers(values[candidate, 0])
+        valid_s_no = pd.notna(s_no)
+        data = candidate.copy()
+        data[candidate] = valid_s_no
+
+        rows = values[data]
+        columns = {}
+        for name, position, kind in StockParser.FIELDS:
+            raw = rows[:, position]
+            if kind == "str":
+                columns[name] = StockParser._clean_str_column(raw)
+            elif kind == "date":
+                columns[name] = StockParser._parse_date_column(raw)
+            else:
+                columns[name] = StockParser._clean_number_column(raw, kind)
+
+        # Report whichever problem the row engine would have hit first.
+        orphan = candidate & ~has_party
+        incomplete = np.zeros(len(data), dtype=bool)
+        incomplete[data] = (columns["lot_no"] == "") | (columns["product"] == "")
+        problem = orphan | incomplete
+        if problem.any() and errors is None:
+            position = problem.argmax()
+            row_number = row_numbers[position]
+            if orphan[position]:
+                raise StockParseError(f"❌ Missing party name before row {row_number}")
+            raise StockParseError(
+                f"❌ Failed to parse row {row_number}: "
+                f"❌ Missing 'lot_no' or 'product' at row {row_number}"
+            )
+
+        columns["party_name"] = party[data]
+        columns["s_no"] = s_no[valid_s_no]
+        keys = ["party_name", "s_no"] + [name for name, _, _ in StockParser.FIELDS]
+
+        if problem.any():
+            for position in np.flatnonzero(problem):
+                row_number = int(row_numbers[position])
+                reason = "Missing party name" if orphan[position] else "Missing 'lot_no' or 'product'"
+                errors.append({"row": row_number, "error": reason})
+            keep = ~problem[data]
+            columns = {key: column[keep] for key, column in columns.items()}
+
+        records = [dict(zip(keys, row)) for row in zip(*(columns[key] for key in keys))]
+        return records, (party[-1] if len(party) else current_party)
+
+    @staticmethod
+    def _to_serial_numbers(raw: np.ndarray) -> np.ndarray:
+        """
+        Batch version of int(cell): Python ints, or None where int() would fail.
+        """
+        result = np.full(len(raw), None, dtype=object)
+        kinds = pd.Series(raw, dtype=object).map(type)
+        number_kinds = [k for k in kinds.unique() if issubclass(k, (int, float, np.number))]
+        text_kinds = [k for k in kinds.unique() if issubclass(k, str)]
+
+        is_number = kinds.isin(number_kinds).to_numpy()
+        numbers = pd.to_numeric(pd.Series(raw[is_number], dtype=object), errors="coerce")
+        numbers = numbers.astype(float).to_numpy()
+        finite = np.zeros(len(raw), dtype=bool)
+        finite[is_number] = np.isfinite(numbers)
+        fits = np.zeros(len(raw), dtype=bool)
+        fits[is_number] = np.abs(numbers) < 2 ** 63
+        result[fits] = np.trunc(numbers[fits[is_number]]).astype("int64").tolist()
+        # Huge values are exact Python ints, which int64 cannot hold.
+        result[finite & ~fits] = [int(value) for value in raw[finite & ~fits]]
+
+        is_text = kinds.isin(text_kinds).to_numpy()
+        text = pd.Series(raw[is_text], dtype=object).astype(str)
+        matches = np.zeros(len(raw), dtype=bool)
+        matches[is_text] = text.str.fullmatch(StockParser.INT_PATTERN).to_numpy(dtype=bool)
+        result[matches] = [int(value) for value in raw[matches]]
+        return result
+
+    @staticmethod
+    def _clean_str_column(raw: np.ndarray) -> np.ndarray:
+        """Batch version of clean_str()."""
+        text = pd.Series(raw, dtype=object).astype(str).str.strip()
+        blank = pd.isna(raw) | text.str.upper().isin(StockParser.NULL_TOKENS).to_numpy()
+        result = text.to_numpy()
+        result[blank] = ""
+        return result
+
+    @staticmethod
+    def _clean_number_column(raw: np.ndarray, kind: str) -> np.ndarray:
+        """Batch version of clean_float() / clean_int()."""
+        text = pd.Series(raw, dtype=object).astype(str).str.strip()
+        result = np.full(len(raw), None, dtype=object)
+        present = ~text.str.upper().isin(["", *StockParser.NULL_TOKENS]).to_numpy()
+
+        # Plain decimal literals: numpy's object-to-float cast calls float() on each one.
+        simple = present & text.str.fullmatch(StockParser.FLOAT_PATTERN).to_numpy(dtype=bool)
+        numbers = text.to_numpy()[simple].astype(float)
+        converted = simple.copy()
+        if kind == "int":
+            usable = np.abs(numbers) < 2 ** 63
+            converted[simple] = usable
+            result[converted] = np.trunc(numbers[usable]).astype("int64").tolist()
+        else:
+            result[converted] = numbers.tolist()
+
+        # Anything unusual ("1_000", "nan", "1e400", ...) goes through the scalar cleaner.
+        clean = StockParser.clean_int if kind == "int" else StockParser.clean_float
+        rest = present & ~converted
+        result[rest] = [clean(value) for value in text[rest]]
+        return result
+
+    @staticmethod
+    def _parse_date_column(raw: pd.Series) -> np.ndarray:
+        """Batch version of parse_excel_date(): parses each distinct cell value once."""
+        codes, uniques = pd.factorize(raw, use_na_sentinel=False)
+        parsed = np.empty(len(uniques), dtype=object)
+        parsed[:] = [StockParser.parse_excel_date(value) for value in uniques]
+        return parsed[codes]
 
 # ---------- 🧪 Debug Usage ----------
 if __name__ == "__main__":
@@ -0,0 +1,202 @@
+# app/utils/rate_limit.py
+# ------------------------------------------------------------
+# Token-bucket rate limiting per client IP and per identity, by route
+# ------------------------------------------------------------
+
+import math
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from flask import Flask, jsonify, request
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+
+
+class MemoryBackend:
+    """
+    Buckets in a dict of this process. Under gunicorn every worker has its own
+    buckets, so the effective budget is multiplied by the number of workers.
+    """
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._buckets = {}  # key -> (tokens, updated_at)
+        self._lock = threading.Lock()
+
+    def take(self, key, capacity, refill_per_second, cost=1.0):
+        """
+        Takes `cost` tokens from a bucket that holds at most `capacity` tokens.
+
+        Returns:
+            float: 0 when allowed, otherwise seconds until enough tokens are back.
+        """
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated_at) * refill_per_second)
+            if tokens < cost:
+                self._buckets[key] = (tokens, now)
+                return (cost - tokens) / refill_per_second
+            self._buckets[key] = (tokens - cost, now)
+            if len(self._buckets) > self.max_keys:
+                self._evict_full(now, capacity, refill_per_second)
+            return 0.0
+
+    def _evict_full(self, now, capacity, refill_per_second):
+        # Buckets that have refilled completely carry no state worth keeping
+        full_after = capacity / refill_per_second
+        for key, (_, updated_at) in list(self._buckets.items()):
+            if now - updated_at >= full_after:
+                del self._buckets[key]
+
+
+class SQLiteBackend:
+    """
+    Buckets in a SQLite file shared by every worker process on the host, a local
+    stand-in for Redis. The file defaults to /dev/shm (shared memory) when present.
+
+    Each take is one short IMMEDIATE transaction, so concurrent workers serialize
+    on the file lock for microseconds.
+
+    Connections are opened on first use, per thread and per process: SQLite
+    connections must not cross fork(), and gunicorn --preload forks workers
+    after create_app() has built this backend.
+    """
+
+    PURGE_EVERY = 1000  # takes between deletions of idle buckets
+    IDLE_SECONDS = 24 * 3600
+
+    def __init__(self, path: str | None = None):
+        shm = "/dev/shm"
+        directory = shm if os.path.isdir(shm) else tempfile.gettempdir()
+        self.path = path or os.path.join(directory, "amirthaagro-rate-limits.sqlite3")
+        self._local = threading.local()
+        self._takes = 0
+
+    def _connect(self):
+        pid = os.getpid()
+        if getattr(self._local, "pid", None) != pid:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=OFF")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS buckets (key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)"
+            )
+            self._local.pid, self._local.connection = pid, connection
+        return self._local.connection
+
+    def take(self, key, capacity, refill_per_second, cost=1.0):
+        """Same contract as MemoryBackend.take, across processes."""
+        now = time.time()
+        connection = self._connect()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = connection.execute("SELECT tokens, updated_at FROM buckets WHERE key = ?", (key,)).fetchone()
+            tokens, updated_at = row if row else (capacity, now)
+            tokens = min(capacity, tokens + max(0.0, now - updated_at) * refill_per_second)
+            wait = 0.0 if tokens >= cost else (cost - tokens) / refill_per_second
+            if not wait:
+                tokens -= cost
+            connection.execute(
+                "INSERT INTO buckets (key, tokens, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, updated_at = excluded.updated_at",
+                (key, tokens, now)
+            )
+            self._takes += 1
+            if self._takes % self.PURGE_EVERY == 0:
+                connection.execute("DELETE FROM buckets WHERE updated_at < ?", (now - self.IDLE_SECONDS,))
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        return wait
+
+
+# Bucket stores by "backend" config value; any object with a matching take() can be added
+BACKENDS = {
+    "memory": MemoryBackend,
+    "sqlite": SQLiteBackend,
+}
+
+
+def init_rate_limiting(app: Flask, config: dict):
+    """
+    Registers per-route token buckets, checked before the view runs (and so
+    before any password hashing, file parsing or DB query).
+
+    Config keys ("rate_limits" in env.json):
+        enabled: Turn rate limiting on (default true).
+        backend: "memory" (per process) or "sqlite" (shared by all workers on the host).
+        path: SQLite file for the "sqlite" backend.
+        trust_forwarded_for: Take the client IP from X-Forwarded-For (behind a proxy).
+        routes: Endpoint name -> budgets, each optional:
+            ip: {"capacity", "per_seconds"}: at most `capacity` requests per client IP,
+                refilled evenly over `per_seconds`.
+            identity: same, per caller identity, plus "source": "json:<field>"
+                (a request body field, e.g. the login email) or "jwt" (the JWT identity).
+    """
+    if not config.get("enabled", True):
+        return
+
+    routes = config.get("routes", {})
+    if not routes:
+        return
+
+    backend_class = BACKENDS[config.get("backend", "memory")]
+    backend = backend_class(config["path"]) if config.get("path") else backend_class()
+    trust_forwarded_for = config.get("trust_forwarded_for", False)
+    app.extensions["rate_limiter"] = backend
+
+    @app.before_request
+    def check_rate_limits():
+        budgets = routes.get(request.endpoint)
+        if budgets is None or request.method == "OPTIONS":
+            return None
+
+        retry_after = 0.0
+        ip_budget = budgets.get("ip")
+        if ip_budget:
+            retry_after = _take(backend, f"{request.endpoint}:ip:{_client_ip(trust_forwarded_for)}", ip_budget)
+
+        identity_budget = budgets.get("identity")
+        if identity_budget and not retry_after:
+            identity = _request_identity(identity_budget.get("source", "jwt"))
+            if identity:
+                retry_after = _take(backend, f"{request.endpoint}:id:{identity}", identity_budget)
+
+        if retry_after:
+            response = jsonify({"error": "Too many requests. Please try again later."})
+            response.status_code = 429
+            response.headers["Retry-After"] = str(math.ceil(retry_after))
+            return response
+        return None
+
+
+def _take(backend, key, budget) -> float:
+    capacity = budget["capacity"]
+    return backend.take(key, capacity, capacity / budget["per_seconds"])
+
+
+def _client_ip(trust_forwarded_for: bool) -> str:
+    if trust_forwarded_for and request.access_route:
+        return request.access_route[0]
+    return request.remote_addr or "unknown"
+
+
+def _request_identity(source: str):
+    """The caller identity a budget is keyed on, or None when the request carries none."""
+    if source == "jwt":
+        try:
+            verify_jwt_in_request(optional=True, locations=["cookies"])
+        except Exception:
+            return None  # invalid or expired tokens are rejected by the view itself
+        return get_jwt_identity()
+
+    if source.startswith("json:"):
+        data = request.get_json(silent=True)
+        value = data.get(source[5:]) if isinstance(data, dict) else None
+        return str(value).strip().lower() if value else None
+
+    raise ValueError(f"Unknown rate limit identity source: {source}")
@@ -0,0 +1,128 @@
+# benchmarks/password_hash_bench.py
+# ------------------------------------------------------------
+# Password verification benchmark: logins/sec, overall and per core
+# ------------------------------------------------------------
+#
+# Usage (from the repository root, no database or network needed):
+#
+#   python -m benchmarks.password_hash_bench
+#   python -m benchmarks.password_hash_bench --workers 1 4 8 --concurrency 32
+#   python -m benchmarks.password_hash_bench --methods scrypt:16384:8:1 --executor process
+#   python -m benchmarks.password_hash_bench --gevent
+#
+# Logins are checked the way /api/auth/login checks them: `--concurrency` request
+# workers call app.services.password_hasher.verify_password, which runs the hash
+# on the hasher's pool (get_executor()). Method, salt length, executor and pool
+# size default to the "passwords" section of env.json; --methods, --executor and
+# --workers override them per run. With --gevent the process is monkey-patched
+# first, so request workers are greenlets and hashes run on a dedicated gevent
+# threadpool, as under a gevent gunicorn worker. An "inline" row calls Werkzeug on
+# the request worker itself, as login did before the pool, for comparison.
+
+import sys
+
+if "--gevent" in sys.argv:
+    from gevent import monkey
+    monkey.patch_all()
+
+import argparse
+import os
+import threading
+import time
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+from app.config.config_loader import config_loader
+from app.services import password_hasher
+
+PASSWORD = "Morning-Login-42"
+
+
+def _cores() -> int:
+    return len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count() or 1
+
+
+def _run_callers(check, logins: int, concurrency: int) -> float:
+    """Runs `logins` checks spread over `concurrency` request workers; returns the wall time."""
+    per_caller = [logins // concurrency + (1 if i < logins % concurrency else 0) for i in range(concurrency)]
+    failures = []
+
+    def caller(count):
+        for _ in range(count):
+            if not check():
+                failures.append(1)
+
+    callers = [threading.Thread(target=caller, args=(count,)) for count in per_caller if count]
+    started = time.perf_counter()
+    for thread in callers:
+        thread.start()
+    for thread in callers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    assert not failures, "password check failed"
+    return elapsed
+
+
+def measure(method: str, logins: int, concurrency: int, workers: int | None, executor: str) -> dict:
+    """
+    Verifies `logins` passwords hashed with `method` and returns the throughput.
+
+    workers=None checks inline on each request worker; otherwise through
+    password_hasher.verify_password on a pool of `workers`.
+    """
+    passwords_cfg = config_loader.config.setdefault("passwords", {})
+    passwords_cfg["method"] = method
+    pwhash = generate_password_hash(PASSWORD, method, passwords_cfg.get("salt_length", 16))
+
+    if workers is None:
+        elapsed = _run_callers(lambda: check_password_hash(pwhash, PASSWORD), logins, concurrency)
+        cores_used = 1
+    else:
+        passwords_cfg["executor"] = executor
+        passwords_cfg["max_workers"] = workers
+        password_hasher.reset_executor()
+        _run_callers(lambda: password_hasher.verify_password(pwhash, PASSWORD), workers, workers)  # warm up
+        elapsed = _run_callers(lambda: password_hasher.verify_password(pwhash, PASSWORD), logins, concurrency)
+        cores_used = min(workers, _cores())
+
+    per_sec = logins / elapsed
+    return {
+        "seconds": round(elapsed, 3),
+        "logins_per_sec": round(per_sec, 1),
+        "logins_per_sec_per_core": round(per_sec / cores_used, 1),
+        "ms_per_login": round(elapsed * 1000 / logins, 2),
+    }
+
+
+def main(argv=None) -> int:
+    passwords_cfg = config_loader.config.get("passwords", {})
+    parser = argparse.ArgumentParser(description="Benchmark password verification through the password hasher.")
+    parser.add_argument("--methods", nargs="+", default=[passwords_cfg.get("method", "scrypt:32768:8:1")],
+                        help="Werkzeug hash methods (default: passwords.method).")
+    parser.add_argument("--workers", type=int, nargs="+", default=[passwords_cfg.get("max_workers", 4)],
+                        help="Hasher pool sizes to try (default: passwords.max_workers).")
+    parser.add_argument("--executor", choices=["thread", "process"], default=passwords_cfg.get("executor", "thread"))
+    parser.add_argument("--concurrency", type=int, default=16, help="Simultaneous logins (request workers).")
+    parser.add_argument("--logins", type=int, default=64, help="Password checks per measurement.")
+    parser.add_argument("--gevent", action="store_true", help="Monkey-patch with gevent (gevent threadpool).")
+    args = parser.parse_args(argv)
+
+    if args.gevent and args.executor == "thread":
+        pool = "gevent threadpool"
+    else:
+        pool = f"{args.executor} pool"
+    print(f"{_cores()} core(s) available, {args.concurrency} concurrent logins, {pool}")
+    print(f"{'method':<24}{'workers':>9}{'seconds':>10}{'logins/s':>11}{'per core':>11}{'ms/login':>10}")
+    for method in args.methods:
+        for workers in [None, *args.workers]:
+            result = measure(method, args.logins, args.concurrency, workers, args.executor)
+            print(
+                f"{method:<24}{workers or 'inline':>9}{result['seconds']:>10.3f}{result['logins_per_sec']:>11.1f}"
+                f"{result['logins_per_sec_per_core']:>11.1f}{result['ms_per_login']:>10.2f}"
+            )
+    password_hasher.reset_executor()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
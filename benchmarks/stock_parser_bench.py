@@ -0,0 +1,233 @@
+# benchmarks/stock_parser_bench.py
+# ------------------------------------------------------------
+# StockParser benchmark: synthetic workbooks, throughput and peak memory
+# ------------------------------------------------------------
+#
+# Usage (from the repository root, no database or network needed):
+#
+#   python -m benchmarks.stock_parser_bench --sizes 1000 10000 100000
+#   python -m benchmarks.stock_parser_bench --save-baseline benchmarks/baseline.json
+#   python -m benchmarks.stock_parser_bench --baseline benchmarks/baseline.json --tolerance 0.25
+#
+# With --baseline, the run exits with status 1 when any mode/size is slower than
+# the baseline by more than the tolerance, so it can gate parser changes.
+
+import argparse
+import gc
+import json
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from openpyxl import Workbook
+
+from app.utils.helpers import StockParser
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 500_000]
+
+HEADER_ROW = [
+    "S NO", "BANK", "LOT NO", "DATE", "MARK", "LORRY", "PRODUCT",
+    "PACKING", "QTY", "WEIGHT KGS", "CHAMBER", "FLOOR", "BAYEE",
+]
+PARTY_WORDS = ["Sri", "Murugan", "Lakshmi", "Agro", "Traders", "Exports", "Mills", "Ganesh", "Balaji", "& Co"]
+BANKS = ["SBI", "IOB", "CANARA", "HDFC", "-", "N/A"]
+PRODUCTS = ["TURMERIC", "CHILLI", "CORIANDER", "JAGGERY", "TAMARIND", "BLACK GRAM"]
+NULL_CELLS = ["-", "N/A", "NA", ""]
+
+
+def _party_name(rng: random.Random, index: int) -> str:
+    """Party names with the casing and spacing noise seen in real sheets."""
+    words = rng.sample(PARTY_WORDS, 3) + [str(index)]
+    name = "  ".join(words) if rng.random() < 0.2 else " ".join(words)
+    return name.upper() if rng.random() < 0.5 else name
+
+
+def _date_cell(rng: random.Random, day: datetime):
+    """Dates as real Excel dates and as the text formats typed by hand."""
+    kind = rng.random()
+    if kind < 0.55:
+        return day
+    if kind < 0.7:
+        return day.strftime("%d/%m/%Y")
+    if kind < 0.8:
+        return day.strftime("%Y-%m-%d")
+    if kind < 0.9:
+        return day.strftime("%d-%b-%Y")
+    return rng.choice(NULL_CELLS)
+
+
+def iter_workbook_rows(rows: int, seed: int = 7):
+    """
+    Yields the raw rows of a synthetic stock sheet with about `rows` stock records.
+
+    Each party block is a party header row, the column header row, its stock rows
+    (with "-"/"N/A" and blank cells, mixed date formats and the odd blank line)
+    and a "PARTY TOTAL" row.
+    """
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    written = 0
+    party_index = 0
+
+    while written < rows:
+        party_index += 1
+        yield [_party_name(rng, party_index)]
+        yield HEADER_ROW
+
+        block = min(rows - written, rng.randint(20, 400))
+        total_qty, total_weight = 0, 0.0
+        for s_no in range(1, block + 1):
+            qty = rng.randint(1, 500)
+            packing = rng.choice([25, 50, 50.5, 75])
+            weight = round(qty * float(packing), 2)
+            total_qty += qty
+            total_weight += weight
+            yield [
+                s_no,
+                rng.choice(BANKS),
+                f"L{rng.randint(1000, 99999)}",
+                _date_cell(rng, start + timedelta(days=rng.randint(0, 600))),
+                rng.choice(["AA", "SK", "-", ""]),
+                f"TN{rng.randint(10, 99)}A{rng.randint(1000, 9999)}",
+                rng.choice(PRODUCTS),
+                packing if rng.random() < 0.95 else rng.choice(NULL_CELLS),
+                qty if rng.random() < 0.97 else "N/A",
+                weight,
+                f"C{rng.randint(1, 12)}",
+                rng.choice(["G", "1", "2", "N/A"]),
+                rng.choice(["B1", "B2", "-", ""]),
+            ]
+            if rng.random() < 0.01:
+                yield []
+        written += block
+
+        yield ["PARTY TOTAL", "", "", "", "", "", "", "", total_qty, round(total_weight, 2)]
+        yield []
+
+
+def generate_workbook(path, rows: int, seed: int = 7) -> Path:
+    """Writes a synthetic .xlsx stock workbook with about `rows` stock records."""
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Stock")
+    for row in iter_workbook_rows(rows, seed):
+        sheet.append(row)
+    workbook.save(path)
+    return Path(path)
+
+
+def _run_rows(path):
+    return len(StockParser.extract_stock_data(str(path), engine="rows"))
+
+
+def _run_vectorized(path):
+    return len(StockParser.extract_stock_data(str(path), engine="vectorized"))
+
+
+def _run_stream(path):
+    return sum(len(chunk) for chunk in StockParser.iter_stock_chunks(str(path)))
+
+
+MODES = {
+    "rows": _run_rows,
+    "vectorized": _run_vectorized,
+    "stream": _run_stream,
+}
+
+
+def measure(mode: str, path, repeat: int = 1) -> dict:
+    """
+    Runs one parser mode on a workbook; keeps the best wall time of `repeat` runs
+    and the peak traced memory of the first one.
+    """
+    run = MODES[mode]
+    best, records, peak = None, 0, 0
+    for attempt in range(repeat):
+        gc.collect()
+        if attempt == 0:
+            tracemalloc.start()
+        started = time.perf_counter()
+        records = run(path)
+        elapsed = time.perf_counter() - started
+        if attempt == 0:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        best = elapsed if best is None else min(best, elapsed)
+    return {
+        "records": records,
+        "seconds": round(best, 4),
+        "rows_per_sec": round(records / best) if best else 0,
+        "peak_mb": round(peak / 2 ** 20, 1),
+    }
+
+
+def check_regressions(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Lists every mode/size whose throughput fell more than `tolerance` below the baseline."""
+    failures = []
+    for key, result in results.items():
+        expected = baseline.get(key, {}).get("rows_per_sec")
+        if expected and result["rows_per_sec"] < expected * (1 - tolerance):
+            failures.append(f"{key}: {result['rows_per_sec']} rows/s < baseline {expected} rows/s")
+    return failures
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark StockParser on synthetic stock workbooks.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Stock records per workbook.")
+    parser.add_argument("--modes", nargs="+", choices=list(MODES), default=list(MODES))
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per mode/size; the best time is kept.")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--workdir", help="Keep generated workbooks here and reuse them on later runs.")
+    parser.add_argument("--baseline", help="JSON results to compare against; exit 1 on regression.")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed throughput drop (0.25 = 25%%).")
+    parser.add_argument("--save-baseline", help="Write this run's results as JSON.")
+    args = parser.parse_args(argv)
+
+    tmp = None if args.workdir else tempfile.TemporaryDirectory(prefix="stock-bench-")
+    workdir = Path(args.workdir or tmp.name)
+    workdir.mkdir(parents=True, exist_ok=True)
+
+    results = {}
+    try:
+        print(f"{'mode':<12}{'rows':>10}{'records':>10}{'seconds':>10}{'rows/s':>12}{'peak MB':>10}")
+        for size in args.sizes:
+            path = workdir / f"stocks_{size}_{args.seed}.xlsx"
+            if not path.exists():
+                generate_workbook(path, size, args.seed)
+            for mode in args.modes:
+                result = measure(mode, path, args.repeat)
+                results[f"{mode}/{size}"] = result
+                print(
+                    f"{mode:<12}{size:>10}{result['records']:>10}{result['seconds']:>10.3f}"
+                    f"{result['rows_per_sec']:>12}{result['peak_mb']:>10.1f}"
+                )
+    finally:
+        if tmp:
+            tmp.cleanup()
+
+    # Every mode must agree on what it parsed, or the timings compare different work.
+    for size in args.sizes:
+        counts = {results[f"{mode}/{size}"]["records"] for mode in args.modes}
+        if len(counts) > 1:
+            print(f"❌ Parser modes disagree on the record count for {size} rows: {sorted(counts)}")
+            return 1
+
+    if args.save_baseline:
+        Path(args.save_baseline).write_text(json.dumps(results, indent=2))
+
+    if args.baseline:
+        failures = check_regressions(results, json.loads(Path(args.baseline).read_text()), args.tolerance)
+        for failure in failures:
+            print(f"❌ Regression: {failure}")
+        if failures:
+            return 1
+        print("✅ No regressions against the baseline.")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+import csv
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+from openpyxl import Workbook
+
+from app.utils.helpers import StockParser, StockParseError
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+def _excel_cell(value):
+    """Types a CSV cell the way Excel stores it: numbers and dd/mm/yyyy dates, else text."""
+    for convert in (int, float):
+        try:
+            return convert(value)
+        except ValueError:
+            pass
+    try:
+        return datetime.strptime(value, "%d/%m/%Y")
+    except ValueError:
+        return value or None
+
+
+def _records(path):
+    return [record for chunk in StockParser.iter_stock_chunks(str(path), chunk_size=4) for record in chunk]
+
+
+def test_ragged_csv_matches_xlsx(tmp_path):
+    # Trailing commas and wide party headers make rows longer than the first one
+    csv_path = FIXTURES / "ragged_stocks.csv"
+    workbook = Workbook()
+    sheet = workbook.active
+    with open(csv_path, newline="", encoding="utf-8-sig") as f:
+        for row in csv.reader(f):
+            sheet.append([_excel_cell(value) for value in row])
+    xlsx_path = tmp_path / "ragged_stocks.xlsx"
+    workbook.save(xlsx_path)
+
+    records = _records(csv_path)
+
+    assert [record["lot_no"] for record in records] == ["L001", "L002", "L003", "L101", "L102"]
+    assert {record["party_name"] for record in records} == {"Sri Balaji Traders", "Murugan Agro Exports"}
+    assert records == _records(xlsx_path)
+
+
+def test_csv_row_errors_match_xlsx(tmp_path):
+    csv_path = tmp_path / "missing_lot.csv"
+    csv_path.write_text("Sri Balaji Traders\n1,HDFC,L001,,,,TURMERIC,,1,,,,,\n2,HDFC,,,,,CHILLI,,1\n")
+    xlsx_path = tmp_path / "missing_lot.xlsx"
+    workbook = Workbook()
+    for row in csv.reader(csv_path.read_text().splitlines()):
+        workbook.active.append([_excel_cell(value) for value in row])
+    workbook.save(xlsx_path)
+
+    with pytest.raises(StockParseError) as csv_error:
+        _records(csv_path)
+    with pytest.raises(StockParseError) as xlsx_error:
+        _records(xlsx_path)
+    assert str(csv_error.value) == str(xlsx_error.value)